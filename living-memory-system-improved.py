@@ -13,24 +13,65 @@ Melhorias implementadas:
 
 import asyncio
 import logging
+import os
+import sys
 from abc import ABC, abstractmethod
 from contextlib import asynccontextmanager
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from enum import Enum
-from functools import lru_cache
 from typing import (
-    Any, AsyncGenerator, Dict, List, Optional,
+    Any, AsyncGenerator, Dict, Iterable, List, Optional,
     Protocol, Set, Union, Tuple
 )
 import json
-from concurrent.futures import ThreadPoolExecutor
 
-# Configuração de logging
-logging.basicConfig(level=logging.INFO)
+from mcp_neo4j._content_hash import CONTENT_SHA1_INDEX, content_sha1
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional; sem ele usa-se o json da stdlib
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 
+# Índices e constraint usados pelas varreduras e pelas ações por id
+SCHEMA_STATEMENTS = (
+    "CREATE CONSTRAINT learning_id IF NOT EXISTS FOR (n:Learning) REQUIRE n.id IS UNIQUE",
+    "CREATE INDEX learning_updated IF NOT EXISTS FOR (n:Learning) ON (n.updated_at)",
+    "CREATE INDEX learning_created IF NOT EXISTS FOR (n:Learning) ON (n.created_at)",
+    "CREATE RANGE INDEX learning_relevance IF NOT EXISTS FOR (n:Learning) ON (n.relevance_score)",
+    CONTENT_SHA1_INDEX,
+    "CREATE CONSTRAINT cleanup_log_day IF NOT EXISTS FOR (d:CleanupLogDay) REQUIRE d.date IS UNIQUE",
+)
+
+
+def as_utc(value: Any) -> Optional[datetime]:
+    """
+    Converte um timestamp lido do Neo4j em datetime com fuso UTC.
+
+    Aceita DateTime do driver, datetime (sem fuso é tratado como UTC) e
+    strings ISO, como as gravadas por create_memory.
+    """
+    if value is None:
+        return None
+    if hasattr(value, "to_native"):
+        value = value.to_native()
+    elif isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def dump_json(data: Any) -> str:
+    """Serializa em JSON compacto, usando orjson quando disponível."""
+    if orjson is not None:
+        return orjson.dumps(data).decode()
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
 class CleanupAction(Enum):
     """Enum para tipos de ações de limpeza."""
     DELETE = "delete"
@@ -68,6 +109,55 @@ class MemoryNode:
             raise ValueError("ID e name são obrigatórios")
 
 
+@dataclass
+class MemoryNodeBatch:
+    """
+    Resultado de uma query em colunas, um campo por propriedade.
+
+    Evita construir um MemoryNode por linha: o score em lote lê as colunas
+    diretamente e node() materializa apenas os nós que viram candidatos.
+    """
+    ids: List[str]
+    names: List[str]
+    categories: List[str]
+    importances: List[str]
+    created_at: List[Optional[datetime]]
+    updated_at: List[Optional[datetime]]
+    access_counts: List[int]
+    connections: List[int]
+
+    @classmethod
+    def from_rows(cls, rows: List[Dict[str, Any]]) -> "MemoryNodeBatch":
+        """Monta as colunas a partir das linhas retornadas pelo Neo4j."""
+        return cls(
+            ids=[row["id"] for row in rows],
+            names=[row["name"] for row in rows],
+            categories=[row.get("category", "general") for row in rows],
+            importances=[row.get("importance", "medium") for row in rows],
+            created_at=[as_utc(row.get("created_at")) for row in rows],
+            updated_at=[as_utc(row.get("updated_at")) for row in rows],
+            access_counts=[row.get("access_count") or 0 for row in rows],
+            connections=[row.get("connections", 0) for row in rows],
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def node(self, index: int) -> MemoryNode:
+        """Materializa o nó da posição informada."""
+        return MemoryNode(
+            id=self.ids[index],
+            name=self.names[index],
+            content="",
+            category=self.categories[index],
+            importance=self.importances[index],
+            created_at=self.created_at[index],
+            updated_at=self.updated_at[index],
+            access_count=self.access_counts[index],
+            connections=self.connections[index]
+        )
+
+
 @dataclass
 class CleanupCandidate:
     """Candidato para ação de limpeza."""
@@ -135,11 +225,51 @@ class RelevanceCalculator(ABC):
         """Calcula score de relevância."""
         ...
 
+    def calculate_batch(self, batch: MemoryNodeBatch) -> List[float]:
+        """Calcula scores de relevância para um lote de nós."""
+        return [self.calculate(batch.node(index)) for index in range(len(batch))]
+
+    def invalidate(self, node_ids: Optional[Iterable[str]] = None) -> None:
+        """Descarta scores guardados dos nós informados (ou de todos)."""
+
+    def cypher_score(self) -> Optional[Tuple[str, Dict[str, float]]]:
+        """
+        Expressão Cypher equivalente a calculate(), se houver.
+
+        A expressão usa as variáveis `n` (o nó) e `connections` (grau do nó)
+        e o parâmetro `$now`.
+        Retorna None quando o score só pode ser calculado no Python.
+        """
+        return None
+
 
 class WeightedRelevanceCalculator(RelevanceCalculator):
     """Calculador de relevância baseado em pesos configuráveis."""
 
-    def __init__(self, weights: Optional[Dict[RelevanceFactors, float]] = None):
+    # Mesma fórmula de calculate(), sem o teto de 1.0 (irrelevante para o
+    # filtro < threshold e aplicado no Python). updated_at pode estar gravado
+    # como string ISO, por isso passa por toString/datetime
+    CYPHER_SCORE = """
+        $w_age * CASE
+            WHEN n.updated_at IS NULL
+                 OR duration.inDays(datetime(toString(n.updated_at)), $now).days >= 365 THEN 0.0
+            ELSE 1.0 - duration.inDays(datetime(toString(n.updated_at)), $now).days / 365.0
+        END
+        + $w_connections * CASE WHEN connections >= 10 THEN 1.0 ELSE connections / 10.0 END
+        + $w_access * CASE
+            WHEN coalesce(n.access_count, 0) >= 50 THEN 1.0
+            ELSE coalesce(n.access_count, 0) / 50.0
+        END
+        + $w_category * CASE WHEN n.category = 'professional' THEN 1.0 ELSE 0.0 END
+        + $w_importance * CASE WHEN n.importance = 'high' THEN 1.0 ELSE 0.0 END
+    """
+
+    def __init__(
+        self,
+        weights: Optional[Dict[RelevanceFactors, float]] = None,
+        cache_size: int = 4096
+    ):
+        self.cache_size = cache_size
         self.weights = weights or {
             RelevanceFactors.AGE: 0.3,
             RelevanceFactors.CONNECTIONS: 0.3,
@@ -153,7 +283,22 @@ class WeightedRelevanceCalculator(RelevanceCalculator):
         if abs(total_weight - 1.0) > 0.01:
             raise ValueError(f"Pesos devem somar 1.0, atual: {total_weight}")
 
-    @lru_cache(maxsize=1000)
+        # Pesos fixos após a construção: desempacotados uma vez em floats, na
+        # ordem idade, conexões, acesso, categoria, importância
+        self._weight_vector: Tuple[float, float, float, float, float] = tuple(
+            self.weights[factor] for factor in (
+                RelevanceFactors.AGE,
+                RelevanceFactors.CONNECTIONS,
+                RelevanceFactors.ACCESS_COUNT,
+                RelevanceFactors.CATEGORY,
+                RelevanceFactors.IMPORTANCE,
+            )
+        )
+
+        # Scores por id do nó: o MemoryNode inteiro (com updated_at e
+        # conteúdo) muda de hash a cada leitura e nunca acertaria um cache
+        self._scores: Dict[str, float] = {}
+
     def calculate(self, node: MemoryNode) -> float:
         """
         Calcula score de relevância baseado em múltiplos fatores.
@@ -164,36 +309,90 @@ class WeightedRelevanceCalculator(RelevanceCalculator):
         Returns:
             Score entre 0.0 e 1.0
         """
+        cached = self._scores.get(node.id)
+        if cached is not None:
+            return cached
+
+        w_age, w_connections, w_access, w_category, w_importance = self._weight_vector
         score = 0.0
 
         # Fator idade
         if node.updated_at:
-            age_days = (datetime.now() - node.updated_at).days
+            age_days = (datetime.now(timezone.utc) - node.updated_at).days
             age_score = max(0, 1 - (age_days / 365))  # Decai em 1 ano
-            score += age_score * self.weights[RelevanceFactors.AGE]
+            score += age_score * w_age
 
         # Fator conexões
         connection_score = min(1.0, node.connections / 10)
-        score += connection_score * self.weights[RelevanceFactors.CONNECTIONS]
+        score += connection_score * w_connections
 
         # Fator acesso
         access_score = min(1.0, node.access_count / 50)
-        score += access_score * self.weights[RelevanceFactors.ACCESS_COUNT]
+        score += access_score * w_access
 
         # Bônus categoria
         if node.category == "professional":
-            score += self.weights[RelevanceFactors.CATEGORY]
+            score += w_category
 
         # Bônus importância
         if node.importance == "high":
-            score += self.weights[RelevanceFactors.IMPORTANCE]
+            score += w_importance
 
-        return min(1.0, score)
+        score = min(1.0, score)
+        if len(self._scores) >= self.cache_size:
+            # Cache cheio: descarta o score mais antigo (ordem de inserção)
+            self._scores.pop(next(iter(self._scores)))
+        self._scores[node.id] = score
+        return score
+
+    def invalidate(self, node_ids: Optional[Iterable[str]] = None) -> None:
+        """Descarta scores guardados dos nós informados (ou de todos)."""
+        if node_ids is None:
+            self._scores.clear()
+            return
+
+        for node_id in node_ids:
+            self._scores.pop(node_id, None)
+
+    def cypher_score(self) -> Optional[Tuple[str, Dict[str, float]]]:
+        """Expressão Cypher da fórmula ponderada e os pesos como parâmetros."""
+        names = ("w_age", "w_connections", "w_access", "w_category", "w_importance")
+        return self.CYPHER_SCORE, dict(zip(names, self._weight_vector))
 
 
 class OptimizedMemoryAnalyzer(MemoryAnalyzer):
     """Analisador otimizado com queries eficientes."""
 
+    # Uma varredura de :Learning agrega todas as métricas por nó; cada
+    # CALL independente anterior repetia a varredura e devolvia colunas
+    # sem correlação entre si. Datas gravadas como string ISO passam por
+    # toString/datetime antes de comparar com os limites
+    ANALYSIS_QUERY = """
+    MATCH (n:Learning)
+    OPTIONAL MATCH (n)-[r]-()
+    WITH n, count(r) as deg
+    RETURN
+        count(n) as total_nodes,
+        sum(CASE WHEN deg = 0 THEN 1 ELSE 0 END) as isolated_count,
+        sum(CASE WHEN datetime(toString(coalesce(n.updated_at, n.created_at))) < $stale_cutoff
+            THEN 1 ELSE 0 END) as stale_count,
+        avg(deg) as avg_connections,
+        avg(n.relevance_score) as avg_relevance,
+        sum(CASE WHEN datetime(toString(n.created_at)) > $growth_cutoff
+            THEN 1 ELSE 0 END) as growth_7d
+    """
+
+    # Duplicatas agrupadas por conteúdo: k nós iguais formam k*(k-1)/2 pares,
+    # sem o self-join O(N²) entre pares de nós
+    # Mesma chave de DUPLICATE_CANDIDATES_QUERY: hash do conteúdo, sem nulos
+    DUPLICATES_QUERY = """
+    MATCH (n:Learning)
+    WHERE n.content_sha1 IS NOT NULL
+    WITH n.content_sha1 as h, count(*) as k
+    WHERE k > 1
+    RETURN sum(k * (k - 1) / 2) as duplicate_pairs
+    """
+
     async def analyze(self, connection: Neo4jConnection) -> MemoryHealthMetrics:
         """
         Analisa saúde da memória com queries otimizadas.
@@ -204,60 +403,31 @@ class OptimizedMemoryAnalyzer(MemoryAnalyzer):
         Returns:
             Métricas de saúde da memória
         """
-
-        # Query única otimizada para múltiplas métricas
-        analysis_query = """
-        // Análise completa em uma query
-        CALL {
-            // Contadores básicos
-            MATCH (n:Learning)
-            RETURN
-                count(n) as total_nodes,
-                avg(n.relevance_score) as avg_relevance
-        }
-        CALL {
-            // Nós isolados
-            MATCH (n:Learning)
-            WHERE NOT EXISTS((n)-[]-())
-            RETURN count(n) as isolated_count
-        }
-        CALL {
-            // Nós obsoletos
-            MATCH (n:Learning)
-            WHERE n.updated_at < datetime() - duration('P90D')
-            OR (n.updated_at IS NULL AND n.created_at < datetime() - duration('P90D'))
-            RETURN count(n) as stale_count
-        }
-        CALL {
-            // Duplicatas
-            MATCH (n1:Learning), (n2:Learning)
-            WHERE n1.id < n2.id AND n1.content = n2.content
-            RETURN count(*) as duplicate_count
-        }
-        CALL {
-            // Conexões médias
-            MATCH (n:Learning)
-            OPTIONAL MATCH (n)-[r]-()
-            RETURN avg(count(r)) as avg_connections
-        }
-        CALL {
-            // Crescimento últimos 7 dias
-            MATCH (n:Learning)
-            WHERE n.created_at > datetime() - duration('P7D')
-            RETURN count(n) as growth_7d
+        results, duplicates = await asyncio.gather(
+            connection.execute_query(self.ANALYSIS_QUERY, self.analysis_parameters()),
+            connection.execute_query(self.DUPLICATES_QUERY)
+        )
+        return self.build_metrics(results, duplicates)
+
+    def analysis_parameters(self) -> Dict[str, datetime]:
+        """Limites de tempo de ANALYSIS_QUERY, calculados no Python."""
+        now = datetime.now(timezone.utc)
+        return {
+            "stale_cutoff": now - timedelta(days=90),
+            "growth_cutoff": now - timedelta(days=7),
         }
-        RETURN
-            total_nodes,
-            isolated_count,
-            stale_count,
-            duplicate_count,
-            avg_connections,
-            avg_relevance,
-            growth_7d
-        """
 
-        results = await connection.execute_query(analysis_query)
+    def build_metrics(
+        self,
+        results: List[Dict[str, Any]],
+        duplicates: List[Dict[str, Any]]
+    ) -> MemoryHealthMetrics:
+        """
+        Monta as métricas a partir das linhas de ANALYSIS_QUERY e DUPLICATES_QUERY.
 
+        Raises:
+            RuntimeError: Se a análise não retornar linhas
+        """
         if not results:
             raise RuntimeError("Falha ao obter métricas de saúde")
 
@@ -267,7 +437,7 @@ class OptimizedMemoryAnalyzer(MemoryAnalyzer):
             total_nodes=result["total_nodes"],
             isolated_nodes=result["isolated_count"],
             stale_nodes=result["stale_count"],
-            duplicate_pairs=result["duplicate_count"],
+            duplicate_pairs=(duplicates[0]["duplicate_pairs"] or 0) if duplicates else 0,
             avg_connections=result["avg_connections"] or 0.0,
             avg_relevance_score=result["avg_relevance"] or 0.0,
             growth_rate_7d=result["growth_7d"]
@@ -286,6 +456,23 @@ class LivingMemorySystem:
     - Type safety completo
     """
 
+    # Agrupa pelo hash indexado em vez de comparar o texto completo
+    DUPLICATE_CANDIDATES_QUERY = """
+    MATCH (n:Learning)
+    WHERE n.content_sha1 IS NOT NULL
+    WITH n ORDER BY n.updated_at DESC, n.access_count DESC
+    WITH n.content_sha1 as h, collect(n) as group
+    WHERE size(group) > 1
+    WITH group[0] as keeper, group[1..] as duplicates
+    UNWIND duplicates as dup
+    RETURN dup.id as id, dup.name as name, dup.content as content,
+           dup.category as category, dup.importance as importance,
+           dup.created_at as created_at, dup.updated_at as updated_at,
+           coalesce(dup.access_count, 0) as access_count, 0 as connections,
+           keeper.id as target_id
+    LIMIT 50
+    """
+
     def __init__(
         self,
         connection: Neo4jConnection,
@@ -293,7 +480,10 @@ class LivingMemorySystem:
         memory_analyzer: Optional[MemoryAnalyzer] = None,
         relevance_threshold: float = 0.3,
         days_until_stale: int = 90,
-        min_connections: int = 1
+        min_connections: int = 1,
+        scan_page_size: int = 500,
+        max_concurrent_queries: int = 8,
+        rescore_interval: timedelta = timedelta(days=1)
     ):
         self.connection = connection
         self.relevance_calculator = relevance_calculator or WeightedRelevanceCalculator()
@@ -301,9 +491,31 @@ class LivingMemorySystem:
         self.relevance_threshold = relevance_threshold
         self.days_until_stale = days_until_stale
         self.min_connections = min_connections
+        self.scan_page_size = scan_page_size
+        self.rescore_interval = rescore_interval
+
+        # Limita queries simultâneas para deixar folga no pool do driver
+        self._query_slots = asyncio.Semaphore(max_concurrent_queries)
+
+        # Último id da página anterior da varredura; None recomeça do início
+        self.scan_cursor: Optional[str] = None
+        # Cursor de partida e ids da última página lida, para recuar o
+        # cursor quando parte dos candidatos não é aplicada no ciclo
+        self._scan_page_start: Optional[str] = None
+        self._scan_page_ids: List[str] = []
 
         # Cache para nós analisados
         self._node_cache: Dict[str, MemoryNode] = {}
+        self._schema_ready = False
+
+    async def ensure_schema(self) -> None:
+        """Cria índices e constraint de :Learning uma única vez por instância."""
+        if self._schema_ready:
+            return
+
+        for statement in SCHEMA_STATEMENTS:
+            await self.connection.execute_query(statement)
+        self._schema_ready = True
 
     async def analyze_memory_health(self) -> MemoryHealthMetrics:
         """
@@ -314,6 +526,81 @@ class LivingMemorySystem:
         """
         return await self.memory_analyzer.analyze(self.connection)
 
+    async def discovery(self) -> Tuple[MemoryHealthMetrics, List[CleanupCandidate]]:
+        """
+        Analisa a saúde e identifica candidatos num único snapshot de leitura.
+
+        Quando a conexão oferece execute_read_many e o analisador é o
+        OptimizedMemoryAnalyzer, as quatro leituras da descoberta rodam numa
+        só transação de leitura. Caso contrário, recai em
+        analyze_memory_health() seguido de identify_cleanup_candidates().
+
+        Returns:
+            Tupla (métricas de saúde, candidatos ordenados por prioridade)
+        """
+        analyzer = self.memory_analyzer
+        if not (hasattr(self.connection, "execute_read_many")
+                and isinstance(analyzer, OptimizedMemoryAnalyzer)):
+            health = await self.analyze_memory_health()
+            return health, await self.identify_cleanup_candidates()
+
+        # Escritas preparatórias ficam fora da transação de leitura
+        await self.ensure_schema()
+        await self._backfill_content_hashes()
+        await self.refresh_relevance_scores()
+
+        scan_query, scan_parameters, scored = self._scan_query()
+        analysis, duplicates, scan_rows, duplicate_rows = await self.connection.execute_read_many([
+            (analyzer.ANALYSIS_QUERY, analyzer.analysis_parameters()),
+            (analyzer.DUPLICATES_QUERY, None),
+            (scan_query, scan_parameters),
+            (self.DUPLICATE_CANDIDATES_QUERY, None),
+        ])
+
+        candidates = (
+            self._scan_candidates(scan_rows, scored)
+            + self._duplicate_candidates(duplicate_rows)
+        )
+        candidates.sort(key=lambda x: x.priority, reverse=True)
+
+        return analyzer.build_metrics(analysis, duplicates), candidates
+
+    async def refresh_relevance_scores(self) -> int:
+        """
+        Grava relevance_score nos nós alterados ou com score vencido.
+
+        Só nós marcados com score_dirty (pelas ações de limpeza), sem score
+        ou com score mais antigo que rescore_interval (o fator idade decai)
+        são recalculados; a varredura passa a ler o score gravado.
+
+        Returns:
+            Número de nós pontuados (0 se o calculador não tem forma Cypher)
+        """
+        score = self.relevance_calculator.cypher_score()
+        if not score:
+            return 0
+
+        relevance_expression, weights = score
+        now = datetime.now(timezone.utc)
+
+        query = f"""
+        MATCH (n:Learning)
+        WHERE n.score_dirty = true OR n.relevance_score IS NULL
+              OR n.relevance_scored_at < $rescore_cutoff
+        WITH n, COUNT {{ (n)--() }} as connections
+        SET n.relevance_score = {relevance_expression},
+            n.relevance_scored_at = $now,
+            n.score_dirty = false
+        RETURN count(n) as scored
+        """
+
+        results = await self.connection.execute_query(query, {
+            **weights,
+            "now": now,
+            "rescore_cutoff": now - self.rescore_interval,
+        })
+        return results[0]["scored"] if results else 0
+
     async def identify_cleanup_candidates(self) -> List[CleanupCandidate]:
         """
         Identifica candidatos para limpeza usando estratégias otimizadas.
@@ -323,118 +610,222 @@ class LivingMemorySystem:
         """
         candidates: List[CleanupCandidate] = []
 
-        # Executar queries em paralelo para melhor performance
-        tasks = [
-            self._find_isolated_nodes(),
-            self._find_stale_nodes(),
-            self._find_duplicate_nodes(),
-            self._find_low_relevance_nodes()
-        ]
+        await self.ensure_schema()
+        await self.refresh_relevance_scores()
 
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        async def run(finder) -> List[CleanupCandidate]:
+            async with self._query_slots:
+                try:
+                    return await finder()
+                except Exception as e:
+                    logger.error(f"Erro ao identificar candidatos: {e}")
+                    return []
 
-        for result in results:
-            if isinstance(result, Exception):
-                logger.error(f"Erro ao identificar candidatos: {result}")
-                continue
-            candidates.extend(result)
+        # Executar queries em paralelo, limitadas pelo semáforo
+        async with asyncio.TaskGroup() as tg:
+            tasks = [
+                tg.create_task(run(self._scan_learning_nodes)),
+                tg.create_task(run(self._find_duplicate_nodes))
+            ]
+
+        for task in tasks:
+            candidates.extend(task.result())
 
         # Ordenar por prioridade (maior prioridade primeiro)
         candidates.sort(key=lambda x: x.priority, reverse=True)
 
         return candidates
 
-    async def _find_isolated_nodes(self) -> List[CleanupCandidate]:
-        """Encontra nós isolados (sem conexões)."""
-        query = """
-        MATCH (n:Learning)
-        WHERE NOT EXISTS((n)-[]-())
-        AND (n.created_at < datetime() - duration('P30D') OR n.created_at IS NULL)
-        RETURN n.id as id, n.name as name, n.content as content,
-               n.category as category, n.importance as importance,
-               n.created_at as created_at, n.updated_at as updated_at,
-               n.access_count as access_count, 0 as connections
-        LIMIT 100
+    async def _scan_learning_nodes(self) -> List[CleanupCandidate]:
         """
+        Encontra nós isolados, obsoletos e de baixa relevância numa só varredura.
 
-        results = await self.connection.execute_query(query)
-        candidates = []
+        Os três critérios precisam de (n, count(r)); a query marca em cada
+        linha quais deles o nó atende e o Python despacha para as regras de
+        decisão correspondentes. Quando o calculador expõe a fórmula em
+        Cypher, a relevância é calculada no servidor e nós pouco conectados
+        mas relevantes nem chegam a ser enviados. O conteúdo dos nós não é
+        projetado: nenhuma decisão aqui depende dele.
 
-        for row in results:
-            node = self._row_to_memory_node(row)
+        A varredura é paginada por id (keyset): cada chamada lê até
+        scan_page_size candidatos a partir de scan_cursor e avança o cursor,
+        sem reler o início do label a cada ciclo.
 
-            # Decisão baseada em idade e importância
-            action = (CleanupAction.DELETE if node.importance != "high"
-                     else CleanupAction.ARCHIVE)
+        Returns:
+            Candidatos das três estratégias
+        """
+        query, parameters, scored = self._scan_query()
+        results = await self.connection.execute_query(query, parameters)
+        return self._scan_candidates(results, scored)
 
-            candidates.append(CleanupCandidate(
-                node=node,
-                action=action,
-                reason="Nó isolado sem conexões",
-                priority=3 if action == CleanupAction.DELETE else 2
-            ))
+    def _scan_query(self) -> Tuple[str, Dict[str, Any], bool]:
+        """
+        Monta a query paginada da varredura de :Learning.
 
-        return candidates
+        Returns:
+            Tupla (query, parâmetros, se a relevância é calculada no servidor)
+        """
+        now = datetime.now(timezone.utc)
+        parameters: Dict[str, Any] = {
+            "now": now,
+            "stale_cutoff": now - timedelta(days=self.days_until_stale),
+            "isolated_cutoff": now - timedelta(days=30),
+            "after_id": self.scan_cursor or "",
+            "page_size": self.scan_page_size,
+            "min_connections": self.min_connections,
+            "relevance_threshold": self.relevance_threshold,
+        }
+        score = self.relevance_calculator.cypher_score()
+        if score:
+            # Score gravado por refresh_relevance_scores(); a fórmula só cobre
+            # nós criados depois da última pontuação
+            relevance_expression, weights = score
+            relevance_expression = f"coalesce(n.relevance_score, {relevance_expression})"
+            parameters.update(weights)
+            low_relevance = "is_low_connected AND relevance < $relevance_threshold"
+        else:
+            relevance_expression = "null"
+            low_relevance = "is_low_connected"
 
-    async def _find_stale_nodes(self) -> List[CleanupCandidate]:
-        """Encontra nós obsoletos."""
         query = f"""
         MATCH (n:Learning)
-        WHERE n.updated_at < datetime() - duration('P{self.days_until_stale}D')
-        OR (n.updated_at IS NULL AND n.created_at < datetime() - duration('P{self.days_until_stale}D'))
-        OPTIONAL MATCH (n)-[r]-()
-        RETURN n.id as id, n.name as name, n.content as content,
+        WHERE n.id > $after_id
+        WITH n, COUNT {{ (n)--() }} as connections,
+             datetime(toString(coalesce(n.updated_at, n.created_at))) < $stale_cutoff as is_stale,
+             datetime(toString(n.created_at)) as created
+        WITH n, connections, is_stale,
+             connections = 0 AND (created < $isolated_cutoff OR created IS NULL) as is_isolated,
+             connections < $min_connections as is_low_connected,
+             {relevance_expression} as relevance
+        WHERE is_isolated OR is_stale OR ({low_relevance})
+        RETURN n.id as id, n.name as name,
                n.category as category, n.importance as importance,
                n.created_at as created_at, n.updated_at as updated_at,
-               n.access_count as access_count, count(r) as connections
-        LIMIT 100
+               coalesce(n.access_count, 0) as access_count, connections,
+               is_isolated, is_stale, is_low_connected, relevance
+        ORDER BY id
+        LIMIT $page_size
         """
 
-        results = await self.connection.execute_query(query)
-        candidates = []
+        return query, parameters, score is not None
 
-        for row in results:
-            node = self._row_to_memory_node(row)
+    def _scan_candidates(self, results: List[Dict[str, Any]], scored: bool) -> List[CleanupCandidate]:
+        """Aplica as regras de decisão às linhas da varredura e avança o cursor."""
+        batch = MemoryNodeBatch.from_rows(results)
+        self._scan_page_start = self.scan_cursor
+        self._scan_page_ids = batch.ids
 
-            # Estratégia baseada em conexões e relevância
-            relevance = self.relevance_calculator.calculate(node)
+        # Página cheia: o próximo ciclo continua depois do último id; senão
+        # a varredura chegou ao fim e recomeça do início
+        self.scan_cursor = batch.ids[-1] if len(batch) == self.scan_page_size else None
 
-            if relevance < self.relevance_threshold:
-                action = CleanupAction.DELETE
-                priority = 4
-            else:
-                action = CleanupAction.ARCHIVE
-                priority = 1
+        if scored:
+            relevances = [min(1.0, row["relevance"]) for row in results]
+        else:
+            # Relevância calculada uma vez, em lote, para todo o resultado
+            relevances = self.relevance_calculator.calculate_batch(batch)
 
-            candidates.append(CleanupCandidate(
-                node=node,
-                action=action,
-                reason=f"Nó obsoleto (relevância: {relevance:.2f})",
-                priority=priority
-            ))
+        candidates = []
+
+        for index, row in enumerate(results):
+            relevance = relevances[index]
+            is_low_relevance = row["is_low_connected"] and relevance < self.relevance_threshold
+            if not (row["is_isolated"] or row["is_stale"] or is_low_relevance):
+                continue
+
+            # MemoryNode só para linhas que viram candidatos
+            node = batch.node(index)
+            if row["is_isolated"]:
+                candidates.append(self._isolated_candidate(node))
+            if row["is_stale"]:
+                candidates.append(self._stale_candidate(node, relevance))
+            if is_low_relevance:
+                candidates.append(self._low_relevance_candidate(node, relevance))
 
         return candidates
 
+    def rewind_scan_cursor(self, first_skipped_id: str) -> None:
+        """
+        Recua o cursor para logo antes de um nó da última página.
+
+        Usado quando o ciclo descarta candidatos da varredura (limite por
+        ciclo): o próximo ciclo volta a ler a página a partir do primeiro
+        nó que ficou sem ação, em vez de só revê-lo quando a varredura
+        der a volta.
+
+        Args:
+            first_skipped_id: Menor id cujo candidato não foi aplicado
+        """
+        applied = [node_id for node_id in self._scan_page_ids if node_id < first_skipped_id]
+        self.scan_cursor = applied[-1] if applied else self._scan_page_start
+
+    def _isolated_candidate(self, node: MemoryNode) -> CleanupCandidate:
+        """Decide a ação para um nó isolado (sem conexões)."""
+        # Decisão baseada em idade e importância
+        action = (CleanupAction.DELETE if node.importance != "high"
+                 else CleanupAction.ARCHIVE)
+
+        return CleanupCandidate(
+            node=node,
+            action=action,
+            reason="Nó isolado sem conexões",
+            priority=3 if action == CleanupAction.DELETE else 2
+        )
+
+    def _stale_candidate(self, node: MemoryNode, relevance: float) -> CleanupCandidate:
+        """Decide a ação para um nó obsoleto."""
+        # Estratégia baseada em conexões e relevância
+        if relevance < self.relevance_threshold:
+            action = CleanupAction.DELETE
+            priority = 4
+        else:
+            action = CleanupAction.ARCHIVE
+            priority = 1
+
+        return CleanupCandidate(
+            node=node,
+            action=action,
+            reason=f"Nó obsoleto (relevância: {relevance:.2f})",
+            priority=priority
+        )
+
+    def _low_relevance_candidate(self, node: MemoryNode, relevance: float) -> CleanupCandidate:
+        """Monta o candidato para um nó pouco conectado e de baixa relevância."""
+        return CleanupCandidate(
+            node=node,
+            action=CleanupAction.DELETE,
+            reason=f"Baixa relevância ({relevance:.2f})",
+            priority=2
+        )
+
+    async def _backfill_content_hashes(self) -> int:
+        """Grava content_sha1 nos nós sem hash ou com o hash curto antigo."""
+        missing = await self.connection.execute_query("""
+        MATCH (n:Learning)
+        WHERE n.content_sha1 IS NULL OR size(n.content_sha1) <> 40
+        RETURN n.id as id, coalesce(n.content, '') as content
+        """)
+        if not missing:
+            return 0
+
+        # Hash calculado no Python e gravado num único UNWIND
+        hashes = [{"id": row["id"], "h": content_sha1(row["content"])} for row in missing]
+        await self.connection.execute_query("""
+        UNWIND $hashes as item
+        MATCH (n:Learning {id: item.id})
+        SET n.content_sha1 = item.h
+        """, {"hashes": hashes})
+        return len(hashes)
+
     async def _find_duplicate_nodes(self) -> List[CleanupCandidate]:
         """Encontra nós duplicados usando hash de conteúdo."""
-        query = """
-        MATCH (n:Learning)
-        WITH n.content as content, collect(n) as nodes
-        WHERE size(nodes) > 1
-        UNWIND nodes as node
-        WITH content, nodes, node
-        ORDER BY node.updated_at DESC, node.access_count DESC
-        WITH content, collect(node)[1..] as duplicates, collect(node)[0] as keeper
-        UNWIND duplicates as dup
-        RETURN dup.id as id, dup.name as name, dup.content as content,
-               dup.category as category, dup.importance as importance,
-               dup.created_at as created_at, dup.updated_at as updated_at,
-               dup.access_count as access_count, 0 as connections,
-               keeper.id as target_id
-        LIMIT 50
-        """
-
-        results = await self.connection.execute_query(query)
+        await self._backfill_content_hashes()
+
+        results = await self.connection.execute_query(self.DUPLICATE_CANDIDATES_QUERY)
+        return self._duplicate_candidates(results)
+
+    def _duplicate_candidates(self, results: List[Dict[str, Any]]) -> List[CleanupCandidate]:
+        """Converte as linhas de duplicatas em candidatos de merge."""
         candidates = []
 
         for row in results:
@@ -450,52 +841,17 @@ class LivingMemorySystem:
 
         return candidates
 
-    async def _find_low_relevance_nodes(self) -> List[CleanupCandidate]:
-        """Encontra nós com baixa relevância."""
-        query = """
-        MATCH (n:Learning)
-        OPTIONAL MATCH (n)-[r]-()
-        WITH n, count(r) as connections
-        WHERE connections < $min_connections
-        RETURN n.id as id, n.name as name, n.content as content,
-               n.category as category, n.importance as importance,
-               n.created_at as created_at, n.updated_at as updated_at,
-               n.access_count as access_count, connections
-        LIMIT 100
-        """
-
-        results = await self.connection.execute_query(
-            query,
-            {"min_connections": self.min_connections}
-        )
-
-        candidates = []
-
-        for row in results:
-            node = self._row_to_memory_node(row)
-            relevance = self.relevance_calculator.calculate(node)
-
-            if relevance < self.relevance_threshold:
-                candidates.append(CleanupCandidate(
-                    node=node,
-                    action=CleanupAction.DELETE,
-                    reason=f"Baixa relevância ({relevance:.2f})",
-                    priority=2
-                ))
-
-        return candidates
-
     def _row_to_memory_node(self, row: Dict[str, Any]) -> MemoryNode:
         """Converte row do Neo4j para MemoryNode."""
         return MemoryNode(
             id=row["id"],
             name=row["name"],
-            content=row["content"] or "",
+            content=row.get("content") or "",
             category=row.get("category", "general"),
             importance=row.get("importance", "medium"),
-            created_at=row.get("created_at"),
-            updated_at=row.get("updated_at"),
-            access_count=row.get("access_count", 0),
+            created_at=as_utc(row.get("created_at")),
+            updated_at=as_utc(row.get("updated_at")),
+            access_count=row.get("access_count") or 0,
             connections=row.get("connections", 0)
         )
 
@@ -511,6 +867,13 @@ class LivingMemorySystem:
         """
         results = CleanupResults()
 
+        # Um nó marcado por várias estratégias recebe só a ação de maior
+        # prioridade (sorted é estável: empates mantêm a ordem recebida)
+        unique: Dict[str, CleanupCandidate] = {}
+        for candidate in sorted(candidates, key=lambda c: c.priority, reverse=True):
+            unique.setdefault(candidate.node.id, candidate)
+        candidates = list(unique.values())
+
         # Agrupar por tipo de ação para otimizar
         actions_map: Dict[CleanupAction, List[CleanupCandidate]] = {}
         for candidate in candidates:
@@ -539,6 +902,11 @@ class LivingMemorySystem:
                 logger.error(error_msg)
                 results.errors.append(error_msg)
 
+        # Nós tocados (e alvos de merge) mudaram: scores guardados não valem mais
+        touched = {c.node.id for c in candidates}
+        touched.update(c.similarity_target for c in candidates if c.similarity_target)
+        self.relevance_calculator.invalidate(touched)
+
         return results
 
     async def _delete_nodes(self, candidates: List[CleanupCandidate]) -> int:
@@ -551,6 +919,10 @@ class LivingMemorySystem:
         query = """
         MATCH (n:Learning)
         WHERE n.id IN $node_ids
+        // Vizinhos perdem uma conexão: score precisa ser recalculado
+        OPTIONAL MATCH (n)--(neighbor)
+        SET neighbor.score_dirty = true
+        WITH DISTINCT n
         DETACH DELETE n
         RETURN count(n) as deleted_count
         """
@@ -578,41 +950,43 @@ class LivingMemorySystem:
 
     async def _merge_nodes(self, candidates: List[CleanupCandidate]) -> int:
         """Mescla nós duplicados."""
-        merged_count = 0
-
-        for candidate in candidates:
-            if not candidate.similarity_target:
-                continue
-
-            query = """
-            MATCH (source:Learning {id: $source_id}), (target:Learning {id: $target_id})
-            // Transferir conexões únicas
-            MATCH (source)-[r]-(other)
-            WHERE NOT (target)-[]-(other)
-            CREATE (target)-[r2]-(other)
-            SET r2 = properties(r)
-            // Mesclar metadados
-            SET target.merged_content = coalesce(target.merged_content, []) + [source.content]
-            SET target.updated_at = datetime()
-            SET target.access_count = target.access_count + source.access_count
-            // Deletar source
-            DETACH DELETE source
-            RETURN 1 as merged
-            """
-
-            try:
-                results = await self.connection.execute_query(query, {
-                    "source_id": candidate.node.id,
-                    "target_id": candidate.similarity_target
-                })
-
-                if results and results[0]["merged"]:
-                    merged_count += 1
+        pairs = [
+            {"source_id": c.node.id, "target_id": c.similarity_target}
+            for c in candidates
+            if c.similarity_target
+        ]
+        if not pairs:
+            return 0
 
-            except Exception as e:
-                logger.error(f"Erro ao mesclar {candidate.node.id}: {e}")
+        # Todos os pares numa única query em vez de uma transação por par
+        query = """
+        UNWIND $pairs as pair
+        MATCH (source:Learning {id: pair.source_id}), (target:Learning {id: pair.target_id})
+        // Transferir conexões únicas
+        OPTIONAL MATCH (source)-[r]-(other)
+        WHERE other <> target AND NOT (target)--(other)
+        WITH source, target, collect({rel: r, other: other}) as edges
+        FOREACH (edge IN [e IN edges WHERE e.rel IS NOT NULL] |
+            CREATE (target)-[r2:RELATED]->(edge.other)
+            SET r2 = properties(edge.rel)
+        )
+        // Mesclar metadados
+        SET target.merged_content = coalesce(target.merged_content, []) + [source.content],
+            target.updated_at = datetime(),
+            target.access_count = coalesce(target.access_count, 0) + coalesce(source.access_count, 0),
+            target.score_dirty = true
+        // Vizinhos do source mudam de grau: score precisa ser recalculado
+        WITH source
+        OPTIONAL MATCH (source)--(neighbor)
+        SET neighbor.score_dirty = true
+        WITH DISTINCT source
+        // Deletar source
+        DETACH DELETE source
+        RETURN count(*) as merged_count
+        """
 
-        return merged_count
+        results = await self.connection.execute_query(query, {"pairs": pairs})
+        return results[0]["merged_count"] if results else 0
 
     async def _update_nodes(self, candidates: List[CleanupCandidate]) -> int:
         """Atualiza timestamp de nós acessados."""
@@ -626,7 +1000,8 @@ class LivingMemorySystem:
         WHERE n.id IN $node_ids
         SET n.last_accessed = datetime(),
             n.access_count = coalesce(n.access_count, 0) + 1,
-            n.updated_at = datetime()
+            n.updated_at = datetime(),
+            n.score_dirty = true
         RETURN count(n) as updated_count
         """
 
@@ -649,13 +1024,16 @@ class AutoCleanupScheduler:
         self,
         memory_system: LivingMemorySystem,
         cleanup_interval: int = 24 * 3600,  # 24 horas
-        max_candidates_per_cycle: int = 1000
+        max_candidates_per_cycle: int = 1000,
+        full_analysis_every: int = 10
     ):
         self.memory_system = memory_system
         self.cleanup_interval = cleanup_interval
         self.max_candidates_per_cycle = max_candidates_per_cycle
+        self.full_analysis_every = full_analysis_every
         self.last_cleanup: Optional[datetime] = None
         self._is_running = False
+        self._cycles = 0
 
     async def run_cleanup_cycle(self) -> CleanupResults:
         """
@@ -673,22 +1051,32 @@ class AutoCleanupScheduler:
         try:
             logger.info("🔄 Iniciando ciclo de limpeza da memória viva...")
 
-            # 1. Analisar saúde atual
-            logger.info("📊 Analisando saúde atual da memória...")
-            health_before = await self.memory_system.analyze_memory_health()
+            # Scores dependem da idade dos nós: cada ciclo começa sem cache
+            self.memory_system.relevance_calculator.invalidate()
+
+            if self.last_cleanup is None:
+                await self._restore_scan_cursor()
+
+            # 1. Analisar saúde atual e identificar candidatos no mesmo snapshot
+            logger.info("📊 Analisando saúde atual e identificando candidatos...")
+            health_before, candidates = await self.memory_system.discovery()
 
             logger.info(f"📈 Estado atual: {health_before.total_nodes} nós, "
                        f"{health_before.isolated_nodes} isolados, "
                        f"relevância média: {health_before.avg_relevance_score:.2f}")
 
-            # 2. Identificar candidatos
-            logger.info("🎯 Identificando candidatos para limpeza...")
-            candidates = await self.memory_system.identify_cleanup_candidates()
-
             # Limitar número de candidatos por ciclo
             if len(candidates) > self.max_candidates_per_cycle:
                 logger.warning(f"⚠️ Limitando candidatos de {len(candidates)} para {self.max_candidates_per_cycle}")
+                skipped = [
+                    candidate.node.id
+                    for candidate in candidates[self.max_candidates_per_cycle:]
+                    if candidate.action != CleanupAction.MERGE
+                ]
                 candidates = candidates[:self.max_candidates_per_cycle]
+                if skipped:
+                    # Nós da varredura que ficaram de fora são relidos no próximo ciclo
+                    self.memory_system.rewind_scan_cursor(min(skipped))
 
             # Log estatísticas dos candidatos
             action_counts = {}
@@ -699,7 +1087,7 @@ class AutoCleanupScheduler:
             for action, count in action_counts.items():
                 logger.info(f"  📋 {action}: {count} candidatos")
 
-            # 3. Aplicar limpeza
+            # 2. Aplicar limpeza
             if candidates:
                 logger.info("🧹 Aplicando ações de limpeza...")
                 results = await self.memory_system.apply_cleanup_actions(candidates)
@@ -723,15 +1111,23 @@ class AutoCleanupScheduler:
                 logger.info("✨ Nenhuma ação de limpeza necessária")
                 results = CleanupResults()
 
-            # 4. Analisar saúde após limpeza
-            health_after = await self.memory_system.analyze_memory_health()
+            # 3. Saúde após limpeza: análise completa só a cada N ciclos; nos
+            # demais, estimada a partir do estado anterior e das ações
+            self._cycles += 1
+            approximate = self._cycles % self.full_analysis_every != 0
+            if approximate:
+                health_after = self._estimate_health(health_before, results)
+            else:
+                health_after = await self.memory_system.analyze_memory_health()
 
             duration = datetime.now() - start_time
             logger.info(f"✅ Ciclo completado em {duration.total_seconds():.1f}s - "
                        f"{results.total_actions} ações executadas")
 
-            # 5. Registrar métricas
-            await self._log_cleanup_metrics(results, health_before, health_after, duration)
+            # 4. Registrar métricas
+            await self._log_cleanup_metrics(
+                results, health_before, health_after, duration, approximate
+            )
 
             self.last_cleanup = datetime.now()
             return results
@@ -739,12 +1135,47 @@ class AutoCleanupScheduler:
         finally:
             self._is_running = False
 
+    async def _restore_scan_cursor(self) -> None:
+        """Retoma a varredura paginada de onde o último ciclo registrado parou."""
+        query = """
+        MATCH (day:CleanupLogDay)
+        RETURN day.scan_cursor as scan_cursor
+        ORDER BY day.date DESC
+        LIMIT 1
+        """
+
+        try:
+            results = await self.memory_system.connection.execute_query(query)
+        except Exception as e:
+            logger.error(f"Erro ao recuperar cursor da varredura: {e}")
+            return
+
+        if results:
+            self.memory_system.scan_cursor = results[0]["scan_cursor"]
+
+    @staticmethod
+    def _estimate_health(
+        health_before: MemoryHealthMetrics,
+        results: CleanupResults
+    ) -> MemoryHealthMetrics:
+        """Estima a saúde após a limpeza sem nova análise do grafo."""
+        return MemoryHealthMetrics(
+            total_nodes=health_before.total_nodes - results.deleted - results.archived - results.merged,
+            isolated_nodes=max(0, health_before.isolated_nodes - results.deleted),
+            stale_nodes=max(0, health_before.stale_nodes - results.deleted - results.archived),
+            duplicate_pairs=max(0, health_before.duplicate_pairs - results.merged),
+            avg_connections=health_before.avg_connections,
+            avg_relevance_score=health_before.avg_relevance_score,
+            growth_rate_7d=health_before.growth_rate_7d
+        )
+
     async def _log_cleanup_metrics(
         self,
         results: CleanupResults,
         health_before: MemoryHealthMetrics,
         health_after: MemoryHealthMetrics,
-        duration: timedelta
+        duration: timedelta,
+        approximate: bool = False
     ) -> None:
         """Registra métricas detalhadas do ciclo."""
 
@@ -752,39 +1183,41 @@ class AutoCleanupScheduler:
             "nodes_removed": health_before.total_nodes - health_after.total_nodes,
             "isolated_reduction": health_before.isolated_nodes - health_after.isolated_nodes,
             "relevance_improvement": health_after.avg_relevance_score - health_before.avg_relevance_score,
-            "duration_seconds": duration.total_seconds()
+            "duration_seconds": duration.total_seconds(),
+            "approximate": approximate
         }
 
-        logger.info(f"📊 Métricas de melhoria: {improvement_metrics}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("📊 Métricas de melhoria: %s", dump_json(improvement_metrics))
 
-        # Em produção, salvar no Neo4j
+        # Um nó por dia: cada ciclo acrescenta sua entrada (JSON, já que
+        # propriedades não guardam mapas) em vez de criar um nó por ciclo
         cleanup_log_query = """
-        CREATE (log:CleanupLog {
-            timestamp: datetime(),
-            duration_seconds: $duration,
-            deleted_count: $deleted,
-            archived_count: $archived,
-            merged_count: $merged,
-            refreshed_count: $refreshed,
-            total_actions: $total_actions,
-            nodes_before: $nodes_before,
-            nodes_after: $nodes_after,
-            relevance_improvement: $relevance_improvement
-        })
-        RETURN log.timestamp as logged_at
+        MERGE (day:CleanupLogDay {date: date()})
+        SET day.entries = coalesce(day.entries, []) + [$entry],
+            day.scan_cursor = $scan_cursor,
+            day.updated_at = datetime()
+        RETURN day.updated_at as logged_at
         """
 
+        entry = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "duration_seconds": duration.total_seconds(),
+            "deleted_count": results.deleted,
+            "archived_count": results.archived,
+            "merged_count": results.merged,
+            "refreshed_count": results.refreshed,
+            "total_actions": results.total_actions,
+            "nodes_before": health_before.total_nodes,
+            "nodes_after": health_after.total_nodes,
+            "relevance_improvement": improvement_metrics["relevance_improvement"],
+            "approximate": approximate,
+        }
+
         try:
             await self.memory_system.connection.execute_query(cleanup_log_query, {
-                "duration": duration.total_seconds(),
-                "deleted": results.deleted,
-                "archived": results.archived,
-                "merged": results.merged,
-                "refreshed": results.refreshed,
-                "total_actions": results.total_actions,
-                "nodes_before": health_before.total_nodes,
-                "nodes_after": health_after.total_nodes,
-                "relevance_improvement": improvement_metrics["relevance_improvement"]
+                "entry": dump_json(entry),
+                "scan_cursor": self.memory_system.scan_cursor
             })
 
             logger.info("📝 Métricas registradas no Neo4j")
@@ -808,11 +1241,14 @@ class MockNeo4jConnection:
                 "total_nodes": 150,
                 "isolated_count": 15,
                 "stale_count": 25,
-                "duplicate_count": 5,
                 "avg_connections": 3.2,
                 "avg_relevance": 0.65,
                 "growth_7d": 12
             }]
+        elif "duplicate_pairs" in query:
+            return [{"duplicate_pairs": 5}]
+        elif "merged_count" in query:
+            return [{"merged_count": len(parameters.get("pairs", []))}]
         elif "DETACH DELETE" in query:
             return [{"deleted_count": len(parameters.get("node_ids", []))}]
         elif "archived_count" in query:
@@ -820,6 +1256,12 @@ class MockNeo4jConnection:
         else:
             return []
 
+    async def execute_read_many(
+        self, queries: List[Tuple[str, Optional[Dict]]]
+    ) -> List[List[Dict[str, Any]]]:
+        """Simula várias leituras numa única transação."""
+        return [await self.execute_query(query, parameters) for query, parameters in queries]
+
     async def close(self) -> None:
         """Mock close."""
         logger.debug("Conexão mock fechada")
@@ -830,16 +1272,11 @@ async def main() -> None:
     Demonstração completa do sistema melhorado.
     """
 
-    print("=" * 60)
-    print("🧠 SISTEMA DE MEMÓRIA VIVA PARA NEO4J - VERSÃO MELHORADA")
-    print("=" * 60)
-
-    # Configurar logging
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    sys.stdout.write(
+        f"{'=' * 60}\n🧠 SISTEMA DE MEMÓRIA VIVA PARA NEO4J - VERSÃO MELHORADA\n{'=' * 60}\n"
     )
 
+
     # Criar conexão mock (em produção usar driver real)
     connection = MockNeo4jConnection()
 
@@ -869,35 +1306,43 @@ async def main() -> None:
         print("\n📊 Analisando saúde da memória...")
         health = await memory_system.analyze_memory_health()
 
-        print(f"  Total de nós: {health.total_nodes}")
-        print(f"  Nós isolados: {health.isolated_nodes}")
-        print(f"  Nós obsoletos: {health.stale_nodes}")
-        print(f"  Duplicatas: {health.duplicate_pairs}")
-        print(f"  Conexões médias: {health.avg_connections:.1f}")
-        print(f"  Relevância média: {health.avg_relevance_score:.2f}")
-        print(f"  Crescimento 7d: {health.growth_rate_7d}")
+        sys.stdout.write(
+            f"  Total de nós: {health.total_nodes}\n"
+            f"  Nós isolados: {health.isolated_nodes}\n"
+            f"  Nós obsoletos: {health.stale_nodes}\n"
+            f"  Duplicatas: {health.duplicate_pairs}\n"
+            f"  Conexões médias: {health.avg_connections:.1f}\n"
+            f"  Relevância média: {health.avg_relevance_score:.2f}\n"
+            f"  Crescimento 7d: {health.growth_rate_7d}\n"
+        )
 
         # Executar ciclo de limpeza
         print("\n🧹 Executando ciclo de limpeza...")
         results = await scheduler.run_cleanup_cycle()
 
-        print(f"\n📈 Resultados do ciclo:")
-        print(f"  ✅ Ações totais: {results.total_actions}")
-        print(f"  🗑️ Deletados: {results.deleted}")
-        print(f"  📦 Arquivados: {results.archived}")
-        print(f"  🔀 Mesclados: {results.merged}")
-        print(f"  🔄 Atualizados: {results.refreshed}")
-
+        # Bloco de resultados montado e escrito de uma vez
+        report = [
+            "\n📈 Resultados do ciclo:",
+            f"  ✅ Ações totais: {results.total_actions}",
+            f"  🗑️ Deletados: {results.deleted}",
+            f"  📦 Arquivados: {results.archived}",
+            f"  🔀 Mesclados: {results.merged}",
+            f"  🔄 Atualizados: {results.refreshed}",
+        ]
         if results.errors:
-            print(f"  ❌ Erros: {len(results.errors)}")
+            report.append(f"  ❌ Erros: {len(results.errors)}")
+        sys.stdout.write("\n".join(report) + "\n")
 
     finally:
         await connection.close()
 
-    print("\n" + "=" * 60)
-    print("✨ Demonstração completa!")
-    print("=" * 60)
+    sys.stdout.write(f"\n{'=' * 60}\n✨ Demonstração completa!\n{'=' * 60}\n")
 
 
 if __name__ == "__main__":
+    # Logging configurado uma única vez, no ponto de entrada
+    logging.basicConfig(
+        level=os.getenv("LOGLEVEL", "INFO"),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
     asyncio.run(main())
\ No newline at end of file
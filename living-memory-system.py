@@ -5,100 +5,460 @@ Mantém apenas aprendizados relevantes e atualizados usando conexões e metadado
 """
 
 import asyncio
-from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Any, Final, Optional
 import json
 
+from mcp_neo4j._content_hash import CONTENT_SHA1_INDEX
+
+try:
+    import numpy as np
+except ImportError:  # numpy é opcional; sem ele a pontuação é feita nó a nó
+    np = None
+
+# Separadores dos banners, montados uma única vez
+SEPARATOR = "=" * 60
+SECTION_BREAK = "\n" + SEPARATOR
+
+# Índices que sustentam as buscas por id e o agrupamento de duplicatas;
+# criados por ensure_schema antes da análise (os USING INDEX exigem que existam)
+SCHEMA_STATEMENTS = (
+    # Mesma constraint de living-memory-system-improved.py; já cria o índice de id
+    "CREATE CONSTRAINT learning_id IF NOT EXISTS FOR (n:Learning) REQUIRE n.id IS UNIQUE",
+    CONTENT_SHA1_INDEX,
+    "CREATE INDEX learning_name IF NOT EXISTS FOR (n:Learning) ON (n.name)",
+    "CREATE INDEX learning_taxonomy IF NOT EXISTS "
+    "FOR (n:Learning) ON (n.project, n.category, n.subcategory)",
+)
+
+# $since padrão: sem limpeza anterior registrada, analisa o grafo inteiro
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+def _utc_naive(value: Any) -> Optional[datetime]:
+    """
+    Normaliza um timestamp (DateTime do driver, datetime ou string ISO)
+    para datetime ingênuo em UTC, aceito pelo numpy e comparável entre si
+    """
+    if value is None:
+        return None
+    if hasattr(value, 'to_native'):
+        value = value.to_native()
+    elif isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+# Linhas por página nas queries de análise ($page); o ciclo avança o
+# cursor $after_id (último n.id da página), imune a nós removidos no caminho
+ANALYSIS_PAGE_SIZE = 10_000
+
+# Queries de análise de saúde (analyze_memory_health)
+CYPHER_HEALTH: Final[Dict[str, str]] = {
+
+    # 1-3. Nós isolados, obsoletos e de baixa relevância numa única
+    # varredura de :Learning; cada nó sai com o primeiro motivo que
+    # casar (coluna reason). Só entram nós
+    # alterados desde $since, com relações novas ou que cruzaram um
+    # limiar de idade (30/90 dias) nesse intervalo. Timestamps gravados como
+    # string ISO (create_memory, self_improve) passam por toString/datetime
+    "node_health": """
+    WITH datetime() as now
+    MATCH (n:Learning)
+    WHERE n.id > $after_id
+    WITH n, now,
+         datetime(toString(coalesce(n.updated_at, n.created_at))) as touched
+    WHERE touched IS NULL OR touched > $since
+       OR (touched <= now - duration('P30D') AND touched > $since - duration('P30D'))
+       OR (touched <= now - duration('P90D') AND touched > $since - duration('P90D'))
+       OR EXISTS { MATCH ()-[r]->(n) WHERE datetime(toString(r.created_at)) > $since }
+    WITH n, COUNT { (n)--() } as connections,
+         duration.inDays(touched, now).days as age
+    WITH n, connections, age,
+         CASE
+             WHEN connections = 0 THEN 'isolated'
+             WHEN age > 90 THEN 'stale'
+             WHEN connections < 2 AND (age > 30 OR n.updated_at IS NULL)
+                 THEN 'low_relevance'
+             ELSE NULL
+         END as reason
+    WHERE reason IS NOT NULL
+    RETURN n.id as id,
+           n.name as name,
+           reason,
+           connections,
+           age
+    ORDER BY id
+    LIMIT $page
+    """,
+
+    # 4. Duplicações (conteúdo similar): um self-join por chave (hash do
+    # conteúdo, preenchido na escrita ou por migrate-content-hash.py; nome;
+    # projeto/categoria/subcategoria), cada um resolvido por seek no índice
+    # da chave em vez de um OR que impede o uso de índices. Só nós
+    # alterados desde $since, com n.id na faixa da página ($after_id,
+    # $until_id], buscam pares; o par é ordenado pelo id interno (inteiro),
+    # o UNION remove pares repetidos e n.id só aparece no RETURN.
+    "duplicate_nodes": """
+    MATCH (changed:Learning)
+    WHERE changed.content_sha1 IS NOT NULL
+    AND datetime(toString(coalesce(changed.updated_at, changed.created_at))) > $since
+    AND changed.id > $after_id AND ($until_id IS NULL OR changed.id <= $until_id)
+    MATCH (other:Learning)
+    USING INDEX other:Learning(content_sha1)
+    WHERE other.content_sha1 = changed.content_sha1 AND other <> changed
+    WITH CASE WHEN id(changed) < id(other) THEN [changed, other]
+              ELSE [other, changed] END as pair
+    RETURN pair[0].id as id1, pair[1].id as id2,
+           pair[0].name as name1, pair[1].name as name2,
+           'duplicate' as reason
+    UNION
+    MATCH (changed:Learning)
+    WHERE changed.name IS NOT NULL
+    AND datetime(toString(coalesce(changed.updated_at, changed.created_at))) > $since
+    AND changed.id > $after_id AND ($until_id IS NULL OR changed.id <= $until_id)
+    MATCH (other:Learning)
+    USING INDEX other:Learning(name)
+    WHERE other.name = changed.name AND other <> changed
+    WITH CASE WHEN id(changed) < id(other) THEN [changed, other]
+              ELSE [other, changed] END as pair
+    RETURN pair[0].id as id1, pair[1].id as id2,
+           pair[0].name as name1, pair[1].name as name2,
+           'duplicate' as reason
+    UNION
+    MATCH (changed:Learning)
+    WHERE changed.project IS NOT NULL AND changed.category IS NOT NULL
+    AND changed.subcategory IS NOT NULL
+    AND datetime(toString(coalesce(changed.updated_at, changed.created_at))) > $since
+    AND changed.id > $after_id AND ($until_id IS NULL OR changed.id <= $until_id)
+    MATCH (other:Learning)
+    USING INDEX other:Learning(project, category, subcategory)
+    WHERE other.project = changed.project AND other.category = changed.category
+    AND other.subcategory = changed.subcategory AND other <> changed
+    WITH CASE WHEN id(changed) < id(other) THEN [changed, other]
+              ELSE [other, changed] END as pair
+    RETURN pair[0].id as id1, pair[1].id as id2,
+           pair[0].name as name1, pair[1].name as name2,
+           'duplicate' as reason
+    """,
+
+    # 5. Conexões quebradas ou inválidas (uma linha por nó, para paginar por n.id)
+    "broken_connections": """
+    MATCH (n:Learning)-[r]-(m)
+    WHERE n.id > $after_id
+    AND NOT m:Learning
+    AND m.id IS NULL
+    AND (datetime(toString(r.created_at)) > $since
+         OR datetime(toString(coalesce(n.updated_at, n.created_at))) > $since)
+    WITH n, collect(type(r)) as relationships
+    RETURN n.id as id,
+           relationships,
+           'broken_connection' as reason
+    ORDER BY id
+    LIMIT $page
+    """
+}
+
+# Regras para manter a memória viva e relevante (create_living_memory_rules)
+LIVING_MEMORY_RULES: Final[Dict[str, Dict[str, List[str]]]] = {
+    "auto_cleanup_rules": {
+        "delete_if": [
+            "isolated AND age > 180 days",
+            "duplicate AND lower_score",
+            "broken_connections AND unfixable",
+            "relevance_score < 0.1"
+        ],
+        "archive_if": [
+            "age > 90 days AND connections < 3",
+            "category = 'temporary' AND age > 30 days",
+            "superseded_by_newer_version"
+        ],
+        "merge_if": [
+            "content_similarity > 0.9",
+            "same_evaluation_id",
+            "same_concept_different_wording"
+        ],
+        "refresh_if": [
+            "frequently_accessed AND age > 30 days",
+            "high_importance AND needs_validation",
+            "external_dependency_changed"
+        ]
+    },
+
+    "relevance_boosters": {
+        "increase_on": [
+            "new_connection_created",
+            "referenced_in_recent_query",
+            "used_in_successful_operation",
+            "validated_by_user"
+        ],
+        "decrease_on": [
+            "no_access_30_days",
+            "contradicted_by_newer_info",
+            "marked_as_outdated",
+            "low_success_rate"
+        ]
+    },
+
+    "connection_patterns": {
+        "strong_connections": [
+            "VALIDATES",
+            "IMPLEMENTS",
+            "REQUIRES",
+            "UPDATES"
+        ],
+        "weak_connections": [
+            "SIMILAR_TO",
+            "MENTIONED_IN",
+            "POSSIBLY_RELATED"
+        ],
+        "negative_connections": [
+            "CONTRADICTS",
+            "SUPERSEDED_BY",
+            "DEPRECATED_BY"
+        ]
+    }
+}
+
+# Queries de limpeza (apply_cleanup_actions)
+CYPHER_CLEANUP: Final[Dict[str, str]] = {
+    # Deletar nós irrelevantes (commit a cada 5k ids; CALL ... IN
+    # TRANSACTIONS exige transação implícita, não execute_write)
+    "delete_nodes": """
+    UNWIND $node_ids as nid
+    CALL {
+        WITH nid
+        MATCH (n:Learning {id: nid})
+        DETACH DELETE n
+        RETURN COUNT(n) as deleted
+    } IN TRANSACTIONS OF 5000 ROWS
+    RETURN sum(deleted) as deleted_count
+    """,
+
+    # Arquivar nós (adicionar label Archive)
+    "archive_nodes": """
+    UNWIND $node_ids as nid
+    CALL {
+        WITH nid
+        MATCH (n:Learning {id: nid})
+        SET n:Archive, n.archived_at = datetime()
+        REMOVE n:Learning
+        RETURN COUNT(n) as archived
+    } IN TRANSACTIONS OF 5000 ROWS
+    RETURN sum(archived) as archived_count
+    """,
+
+    # Mesclar nós duplicados: o apoc reaponta as relações de n2 para
+    # n1 numa única passada e remove n2; 'discard' mantém as
+    # propriedades de n1 (content continua string)
+    "merge_duplicates": """
+    MATCH (n1:Learning {id: $id1}), (n2:Learning {id: $id2})
+    // Preservar informações importantes de n2
+    SET n1.merged_content = coalesce(n1.merged_content, []) + n2.content,
+        n1.updated_at = datetime()
+    WITH n1, n2
+    CALL apoc.refactor.mergeNodes([n1, n2], {
+        properties: 'discard',
+        mergeRels: true,
+        produceSelfRel: false
+    })
+    YIELD node
+    RETURN node.id as merged_node
+    """,
+
+    # Atualizar timestamp de nós acessados
+    "refresh_accessed": """
+    UNWIND $node_ids as nid
+    CALL {
+        WITH nid
+        MATCH (n:Learning {id: nid})
+        SET n.last_accessed = datetime(),
+            n.access_count = coalesce(n.access_count, 0) + 1
+        RETURN COUNT(n) as refreshed
+    } IN TRANSACTIONS OF 5000 ROWS
+    RETURN sum(refreshed) as refreshed_count
+    """
+}
+
+# Queries de monitoramento de crescimento (monitor_memory_growth)
+CYPHER_MONITORING: Final[Dict[str, str]] = {
+    # Taxa de crescimento
+    "growth_rate": """
+    MATCH (n:Learning)
+    WHERE n.created_at > datetime() - duration('P7D')
+    RETURN date(n.created_at) as day,
+           COUNT(n) as new_nodes
+    ORDER BY day
+    """,
+
+    # Distribuição por categoria
+    "category_distribution": """
+    MATCH (n:Learning)
+    RETURN n.category as category,
+           COUNT(n) as count,
+           AVG(n.relevance_score) as avg_relevance
+    ORDER BY count DESC
+    """,
+
+    # Conexões médias
+    "connection_health": """
+    MATCH (n:Learning)
+    WITH n, COUNT { (n)--() } as connections
+    RETURN AVG(connections) as avg_connections,
+           MIN(connections) as min_connections,
+           MAX(connections) as max_connections,
+           percentileCont(connections, 0.5) as median_connections
+    """,
+
+    # Nós mais conectados (hubs)
+    "knowledge_hubs": """
+    MATCH (n:Learning)-[r]-()
+    WITH n, COUNT(r) as connections
+    WHERE connections > 10
+    RETURN n.id, n.name, connections
+    ORDER BY connections DESC
+    LIMIT 10
+    """
+}
+
+
 class LivingMemorySystem:
     """
     Sistema que mantém a memória do Neo4j viva e relevante
     """
 
-    def __init__(self):
+    # Classificação dos candidatos feita no servidor: só id e ação voltam.
+    # Restrita aos nós alterados desde $since ou que cruzaram um limiar
+    CLASSIFY_CLEANUP_QUERY = """
+    WITH datetime() as now
+    MATCH (n:Learning)
+    WHERE n.id > $after_id
+    WITH n, now,
+         datetime(toString(coalesce(n.updated_at, n.created_at))) as touched
+    WHERE touched > $since
+       OR (touched <= now - duration('P30D') AND touched > $since - duration('P30D'))
+       OR (touched <= now - duration('P90D') AND touched > $since - duration('P90D'))
+       OR (touched <= now - duration('P180D') AND touched > $since - duration('P180D'))
+       OR EXISTS { MATCH ()-[r]->(n) WHERE datetime(toString(r.created_at)) > $since }
+    WITH n, COUNT { (n)--() } as connections,
+         duration.inDays(touched, now).days as age
+    WITH n, connections, age,
+         CASE
+             WHEN connections = 0 AND age > 180 THEN 'delete'
+             WHEN age > 90 AND connections < 3 THEN 'archive'
+             WHEN connections < 2 AND age > 30 THEN 'update'
+             ELSE NULL
+         END as action
+    WHERE action IS NOT NULL
+    RETURN n.id as id, n.name as name, action, connections,
+           datetime(toString(n.updated_at)) as updated_at,
+           coalesce(n.access_count, 0) as access_count,
+           n.category as category, n.importance as importance
+    ORDER BY id
+    LIMIT $page
+    """
+
+    def __init__(self, connection=None):
+        # Conexão opcional (execute_query assíncrono); sem ela, modo demonstração
+        self.connection = connection
+        self._schema_ready = False
         self.relevance_threshold = 0.3  # Score mínimo para manter
         self.days_until_stale = 90      # Dias até considerar obsoleto
         self.min_connections = 1        # Conexões mínimas para relevância
 
+    async def ensure_schema(self) -> None:
+        """
+        Cria os índices exigidos pelos hints de duplicate_nodes e espera que fiquem
+        ONLINE (uma vez por instância)
+        """
+        if self.connection is None or self._schema_ready:
+            return
+
+        for statement in SCHEMA_STATEMENTS:
+            await self.connection.execute_query(statement)
+        # Índice recém-criado fica POPULATING; o planner recusa USING INDEX
+        # enquanto ele não estiver ONLINE
+        await self.connection.execute_query("CALL db.awaitIndexes()")
+        self._schema_ready = True
+
     async def analyze_memory_health(self) -> Dict[str, Any]:
         """
         Analisa a saúde geral da memória e identifica problemas
         """
-
-        # Query para analisar conexões e relevância
-        analysis_queries = {
-
-            # 1. Nós isolados (sem conexões)
-            "isolated_nodes": """
-            MATCH (n:Learning)
-            WHERE NOT EXISTS((n)-[]-())
-            RETURN n.id as id,
-                   n.name as name,
-                   n.created_at as created,
-                   'isolated' as reason
-            """,
-
-            # 2. Nós obsoletos (muito antigos sem updates)
-            "stale_nodes": """
-            MATCH (n:Learning)
-            WHERE n.updated_at < datetime() - duration('P90D')
-            OR (n.updated_at IS NULL AND n.created_at < datetime() - duration('P90D'))
-            RETURN n.id as id,
-                   n.name as name,
-                   n.updated_at as last_update,
-                   'stale' as reason
-            """,
-
-            # 3. Duplicações (conteúdo similar)
-            "duplicate_nodes": """
-            MATCH (n1:Learning), (n2:Learning)
-            WHERE n1.id < n2.id
-            AND (
-                n1.content = n2.content
-                OR n1.name = n2.name
-                OR (n1.project = n2.project AND n1.category = n2.category
-                    AND n1.subcategory = n2.subcategory)
-            )
-            RETURN n1.id as id1, n2.id as id2,
-                   n1.name as name1, n2.name as name2,
-                   'duplicate' as reason
-            """,
-
-            # 4. Nós com baixa relevância (poucas conexões e antigos)
-            "low_relevance": """
-            MATCH (n:Learning)
-            OPTIONAL MATCH (n)-[r]-()
-            WITH n, COUNT(r) as connections
-            WHERE connections < 2
-            AND (n.updated_at < datetime() - duration('P30D')
-                 OR n.updated_at IS NULL)
-            RETURN n.id as id,
-                   n.name as name,
-                   connections,
-                   'low_relevance' as reason
-            """,
-
-            # 5. Conexões quebradas ou inválidas
-            "broken_connections": """
-            MATCH (n:Learning)-[r]-(m)
-            WHERE NOT m:Learning
-            AND NOT EXISTS(m.id)
-            RETURN n.id as id,
-                   type(r) as relationship,
-                   'broken_connection' as reason
-            """
+        await self.ensure_schema()
+        return CYPHER_HEALTH
+
+    @staticmethod
+    def analysis_parameters(
+        since: Optional[datetime] = None,
+        after_id: str = "",
+        page: int = ANALYSIS_PAGE_SIZE,
+        until_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Parâmetros das queries de análise; sem `since`, cobre o grafo inteiro
+        """
+        return {
+            "since": since or EPOCH,
+            "after_id": after_id,
+            "page": page,
+            "until_id": until_id
         }
 
-        return analysis_queries
-
     def calculate_relevance_score(self, node: Dict[str, Any]) -> float:
         """
         Calcula score de relevância de um nó baseado em múltiplos fatores
         """
+        return self.calculate_relevance_scores([node])[0]
+
+    def calculate_relevance_scores(self, nodes: List[Dict[str, Any]]) -> List[float]:
+        """
+        Calcula o score de relevância de vários nós de uma vez
+
+        Monta colunas (idade, conexões, acessos, flags) a partir das linhas
+        retornadas pelo driver e avalia a fórmula com operações vetoriais
+        do numpy. Sem numpy instalado, pontua nó a nó.
+        """
+        if np is None or not nodes:
+            return [self._score_node(node) for node in nodes]
+
+        now = np.datetime64(_utc_naive(datetime.now(timezone.utc)), 's')
+        updated = np.array(
+            [_utc_naive(node.get('updated_at')) for node in nodes],
+            dtype='datetime64[s]'
+        )
+        has_update = ~np.isnat(updated)
+        age_days = np.where(has_update, (now - updated).astype(np.int64) // 86400, 0)
+        connections = np.array([node.get('connections', 0) for node in nodes], dtype=float)
+        access_count = np.array([node.get('access_count', 0) for node in nodes], dtype=float)
+        professional = np.array([node.get('category') == 'professional' for node in nodes])
+        high = np.array([node.get('importance') == 'high' for node in nodes])
+
+        # Fator 1: Idade (mais recente = maior score, decai em 1 ano)
+        age_score = np.where(has_update, np.clip(1 - age_days / 365, 0, None), 0.0)
+        # Fator 2: Número de conexões (máximo em 10 conexões)
+        connection_score = np.minimum(1, connections / 10.0)
+        # Fator 3: Frequência de acesso (máximo em 50 acessos)
+        access_score = np.minimum(1, access_count / 50.0)
+
+        score = age_score * 0.3 + connection_score * 0.3 + access_score * 0.2
+        # Fator 4: Importância/Categoria
+        score += professional * 0.1 + high * 0.1
+
+        return np.minimum(1.0, score).tolist()
+
+    @staticmethod
+    def _score_node(node: Dict[str, Any]) -> float:
+        """
+        Score de um único nó em Python puro (usado quando numpy não está disponível)
+        """
         score = 0.0
 
         # Fator 1: Idade (mais recente = maior score)
-        if 'updated_at' in node:
-            age_days = (datetime.now() - node['updated_at']).days
+        updated_at = _utc_naive(node.get('updated_at'))
+        if updated_at is not None:
+            age_days = (_utc_naive(datetime.now(timezone.utc)) - updated_at).days
             age_score = max(0, 1 - (age_days / 365))  # Decai em 1 ano
             score += age_score * 0.3
 
@@ -120,9 +480,21 @@ class LivingMemorySystem:
 
         return min(1.0, score)
 
-    async def identify_nodes_to_clean(self) -> Dict[str, List[Dict]]:
+    async def identify_nodes_to_clean(
+        self,
+        since: Optional[datetime] = None,
+        after_id: str = "",
+        page: int = ANALYSIS_PAGE_SIZE
+    ) -> Dict[str, Any]:
         """
         Identifica nós que devem ser limpos ou consolidados
+
+        Com `since`, só reavalia o que mudou desde a última limpeza.
+        Retorna uma página de candidatos com n.id acima de `after_id`: até
+        `page` nós classificados e as duplicatas da mesma faixa de ids.
+        Em "page" vêm o total de linhas lidas ("scanned") e o último n.id
+        lido ("last_id"), antes do filtro por score; a paginação usa esses
+        valores, e menos de `page` linhas lidas indica a última página.
         """
 
         cleanup_candidates = {
@@ -132,28 +504,44 @@ class LivingMemorySystem:
             "update": []       # Atualizar/refrescar
         }
 
-        # Simular análise (em produção, faria queries reais)
-        sample_analysis = {
-            "isolated_old_nodes": [
-                {"id": "node-123", "name": "Aprendizado obsoleto", "age_days": 180, "connections": 0}
-            ],
-            "duplicate_best_practices": [
-                {"id1": "node-18", "id2": "node-45", "content": "Type hints completos", "similarity": 0.95}
-            ],
-            "low_value_nodes": [
-                {"id": "node-789", "score": 0.15, "reason": "Sem acessos há 60 dias"}
+        if self.connection is None and after_id:
+            # Demonstração cabe numa única página
+            classified, duplicates = [], []
+        elif self.connection is None:
+            # Demonstração: linhas no mesmo formato que as queries retornam
+            classified = [
+                {"id": "node-123", "name": "Aprendizado obsoleto", "action": "archive"}
             ]
-        }
-
-        # Classificar nós para ação
-        for node in sample_analysis.get("isolated_old_nodes", []):
-            if node["age_days"] > 180 and node["connections"] == 0:
-                cleanup_candidates["delete"].append(node)
-            elif node["age_days"] > 90:
-                cleanup_candidates["archive"].append(node)
+            duplicates = [
+                {"id1": "node-18", "id2": "node-45",
+                 "name1": "Type hints completos", "name2": "Type hints completos",
+                 "reason": "duplicate"}
+            ]
+        else:
+            await self.ensure_schema()
+            classified = await self.connection.execute_query(
+                self.CLASSIFY_CLEANUP_QUERY, self.analysis_parameters(since, after_id, page)
+            )
+            # Página cheia fecha a faixa no último id; senão vai até o fim
+            until_id = classified[-1]["id"] if len(classified) == page else None
+            duplicates = await self.connection.execute_query(
+                CYPHER_HEALTH["duplicate_nodes"],
+                self.analysis_parameters(since, after_id, page, until_id)
+            )
 
-        for dup in sample_analysis.get("duplicate_best_practices", []):
-            cleanup_candidates["merge"].append(dup)
+        # Classificar nós para ação; nós com score acima do limiar são mantidos
+        scores = self.calculate_relevance_scores(classified)
+        for row, score in zip(classified, scores):
+            row["score"] = round(score, 3)
+            if row["action"] != "update" and score >= self.relevance_threshold:
+                continue
+            cleanup_candidates[row["action"]].append(row)
+
+        cleanup_candidates["merge"].extend(duplicates)
+        cleanup_candidates["page"] = {
+            "scanned": len(classified),
+            "last_id": classified[-1]["id"] if classified else after_id
+        }
 
         return cleanup_candidates
 
@@ -161,167 +549,47 @@ class LivingMemorySystem:
         """
         Define regras para manter a memória viva e relevante
         """
+        return LIVING_MEMORY_RULES
 
-        rules = {
-            "auto_cleanup_rules": {
-                "delete_if": [
-                    "isolated AND age > 180 days",
-                    "duplicate AND lower_score",
-                    "broken_connections AND unfixable",
-                    "relevance_score < 0.1"
-                ],
-                "archive_if": [
-                    "age > 90 days AND connections < 3",
-                    "category = 'temporary' AND age > 30 days",
-                    "superseded_by_newer_version"
-                ],
-                "merge_if": [
-                    "content_similarity > 0.9",
-                    "same_evaluation_id",
-                    "same_concept_different_wording"
-                ],
-                "refresh_if": [
-                    "frequently_accessed AND age > 30 days",
-                    "high_importance AND needs_validation",
-                    "external_dependency_changed"
-                ]
-            },
-
-            "relevance_boosters": {
-                "increase_on": [
-                    "new_connection_created",
-                    "referenced_in_recent_query",
-                    "used_in_successful_operation",
-                    "validated_by_user"
-                ],
-                "decrease_on": [
-                    "no_access_30_days",
-                    "contradicted_by_newer_info",
-                    "marked_as_outdated",
-                    "low_success_rate"
-                ]
-            },
-
-            "connection_patterns": {
-                "strong_connections": [
-                    "VALIDATES",
-                    "IMPLEMENTS",
-                    "REQUIRES",
-                    "UPDATES"
-                ],
-                "weak_connections": [
-                    "SIMILAR_TO",
-                    "MENTIONED_IN",
-                    "POSSIBLY_RELATED"
-                ],
-                "negative_connections": [
-                    "CONTRADICTS",
-                    "SUPERSEDED_BY",
-                    "DEPRECATED_BY"
-                ]
-            }
-        }
-
-        return rules
-
-    async def apply_cleanup_actions(self, candidates: Dict[str, List]) -> Dict[str, Any]:
+    async def apply_cleanup_actions(self, candidates: Dict[str, Any]) -> Dict[str, int]:
         """
         Aplica as ações de limpeza identificadas
+
+        Retorna quantos nós cada ação de fato alterou; sem conexão nada é
+        executado e as contagens ficam em zero.
         """
+        applied = {"deleted": 0, "archived": 0, "merged": 0, "refreshed": 0}
+        if self.connection is None:
+            return applied
+
+        batches = (
+            ("delete", "delete_nodes", "deleted"),
+            ("archive", "archive_nodes", "archived"),
+            ("update", "refresh_accessed", "refreshed"),
+        )
+        for action, query_name, counter in batches:
+            node_ids = [row["id"] for row in candidates[action]]
+            if not node_ids:
+                continue
+            rows = await self.connection.execute_query(
+                CYPHER_CLEANUP[query_name], {"node_ids": node_ids}
+            )
+            applied[counter] = rows[0][f"{counter}_count"] if rows else 0
 
-        cleanup_cypher = {
-            # Deletar nós irrelevantes
-            "delete_nodes": """
-            MATCH (n:Learning)
-            WHERE n.id IN $node_ids
-            DETACH DELETE n
-            RETURN COUNT(n) as deleted_count
-            """,
-
-            # Arquivar nós (adicionar label Archive)
-            "archive_nodes": """
-            MATCH (n:Learning)
-            WHERE n.id IN $node_ids
-            SET n:Archive, n.archived_at = datetime()
-            REMOVE n:Learning
-            RETURN COUNT(n) as archived_count
-            """,
-
-            # Mesclar nós duplicados
-            "merge_duplicates": """
-            MATCH (n1:Learning {id: $id1}), (n2:Learning {id: $id2})
-            // Transferir conexões de n2 para n1
-            MATCH (n2)-[r]-(other)
-            WHERE NOT (n1)-[]-(other)
-            CREATE (n1)-[r2:MERGED_FROM]-(other)
-            SET r2 = properties(r)
-            // Preservar informações importantes de n2
-            SET n1.merged_content = coalesce(n1.merged_content, []) + n2.content
-            SET n1.updated_at = datetime()
-            // Deletar n2
-            DETACH DELETE n2
-            RETURN n1.id as merged_node
-            """,
-
-            # Atualizar timestamp de nós acessados
-            "refresh_accessed": """
-            MATCH (n:Learning)
-            WHERE n.id IN $node_ids
-            SET n.last_accessed = datetime(),
-                n.access_count = coalesce(n.access_count, 0) + 1
-            RETURN COUNT(n) as refreshed_count
-            """
-        }
+        # Pares cujo nó já foi removido (nesta ou noutra ação) não retornam linha
+        for pair in candidates["merge"]:
+            rows = await self.connection.execute_query(
+                CYPHER_CLEANUP["merge_duplicates"], {"id1": pair["id1"], "id2": pair["id2"]}
+            )
+            applied["merged"] += len(rows)
 
-        return cleanup_cypher
+        return applied
 
     async def monitor_memory_growth(self) -> Dict[str, Any]:
         """
         Monitora crescimento e saúde da memória ao longo do tempo
         """
-
-        monitoring_queries = {
-            # Taxa de crescimento
-            "growth_rate": """
-            MATCH (n:Learning)
-            WHERE n.created_at > datetime() - duration('P7D')
-            RETURN date(n.created_at) as day,
-                   COUNT(n) as new_nodes
-            ORDER BY day
-            """,
-
-            # Distribuição por categoria
-            "category_distribution": """
-            MATCH (n:Learning)
-            RETURN n.category as category,
-                   COUNT(n) as count,
-                   AVG(n.relevance_score) as avg_relevance
-            ORDER BY count DESC
-            """,
-
-            # Conexões médias
-            "connection_health": """
-            MATCH (n:Learning)
-            OPTIONAL MATCH (n)-[r]-()
-            WITH n, COUNT(r) as connections
-            RETURN AVG(connections) as avg_connections,
-                   MIN(connections) as min_connections,
-                   MAX(connections) as max_connections,
-                   percentileCont(connections, 0.5) as median_connections
-            """,
-
-            # Nós mais conectados (hubs)
-            "knowledge_hubs": """
-            MATCH (n:Learning)-[r]-()
-            WITH n, COUNT(r) as connections
-            WHERE connections > 10
-            RETURN n.id, n.name, connections
-            ORDER BY connections DESC
-            LIMIT 10
-            """
-        }
-
-        return monitoring_queries
+        return CYPHER_MONITORING
 
 
 class AutoCleanupScheduler:
@@ -332,7 +600,23 @@ class AutoCleanupScheduler:
     def __init__(self, memory_system: LivingMemorySystem):
         self.memory_system = memory_system
         self.cleanup_interval = 24 * 3600  # 24 horas
-        self.last_cleanup = None
+        self.last_cleanup: Optional[datetime] = None
+        self.page_size = ANALYSIS_PAGE_SIZE  # Linhas por página de candidatos
+        self._last_cleanup_loaded = False
+
+    async def load_last_cleanup(self) -> Optional[datetime]:
+        """
+        Carrega o horário da última limpeza registrada em :CleanupLog
+        """
+        connection = self.memory_system.connection
+        if connection is not None and not self._last_cleanup_loaded:
+            rows = await connection.execute_query(
+                "MATCH (log:CleanupLog) RETURN max(log.timestamp) as last_cleanup"
+            )
+            if rows and rows[0]["last_cleanup"] is not None:
+                self.last_cleanup = rows[0]["last_cleanup"].to_native()
+        self._last_cleanup_loaded = True
+        return self.last_cleanup
 
     async def run_cleanup_cycle(self) -> Dict[str, Any]:
         """
@@ -341,8 +625,13 @@ class AutoCleanupScheduler:
 
         print("🔄 Iniciando ciclo de limpeza da memória viva...")
 
+        # Só o que mudou desde a última limpeza é reavaliado
+        since = await self.load_last_cleanup()
+        started_at = datetime.now(timezone.utc)
+
         results = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": started_at.isoformat(),
+            "since": (since or EPOCH).isoformat(),
             "actions": {
                 "deleted": 0,
                 "archived": 0,
@@ -357,31 +646,46 @@ class AutoCleanupScheduler:
         health = await self.memory_system.analyze_memory_health()
         results["health_before"] = health
 
-        # 2. Identificar candidatos para limpeza
-        candidates = await self.memory_system.identify_nodes_to_clean()
+        # 2-3. Identificar candidatos e aplicar ações página a página,
+        # mantendo em memória só uma página por vez; o cursor é o último
+        # n.id lido pela query (inclusive os mantidos pelo score), então
+        # nós removidos ou poupados não deslocam nem encerram as páginas
+        after_id = ""
+        while True:
+            candidates = await self.memory_system.identify_nodes_to_clean(
+                since, after_id, self.page_size
+            )
+            applied = await self.memory_system.apply_cleanup_actions(candidates)
+            for counter, count in applied.items():
+                results["actions"][counter] += count
+
+            page = candidates["page"]
+            if page["scanned"] < self.page_size:
+                break
+            after_id = page["last_id"]
 
-        # 3. Aplicar ações de limpeza
-        if candidates["delete"]:
+        if results["actions"]["deleted"]:
             # Deletar nós irrelevantes
-            results["actions"]["deleted"] = len(candidates["delete"])
             print(f"  🗑️ Deletando {results['actions']['deleted']} nós irrelevantes")
 
-        if candidates["archive"]:
+        if results["actions"]["archived"]:
             # Arquivar nós antigos mas potencialmente úteis
-            results["actions"]["archived"] = len(candidates["archive"])
             print(f"  📦 Arquivando {results['actions']['archived']} nós antigos")
 
-        if candidates["merge"]:
+        if results["actions"]["merged"]:
             # Mesclar duplicatas
-            results["actions"]["merged"] = len(candidates["merge"])
             print(f"  🔀 Mesclando {results['actions']['merged']} duplicatas")
 
         # 4. Analisar saúde após limpeza
         health_after = await self.memory_system.analyze_memory_health()
         results["health_after"] = health_after
 
-        # 5. Registrar limpeza
+        # 5. Registrar limpeza. O próximo ciclo só parte deste horário se
+        # as ações foram de fato executadas: sem conexão nada foi aplicado e
+        # os nós sinalizados precisam continuar elegíveis
         await self.log_cleanup_action(results)
+        if self.memory_system.connection is not None:
+            self.last_cleanup = started_at
 
         print(f"✅ Ciclo de limpeza completo: {sum(results['actions'].values())} ações executadas")
 
@@ -392,19 +696,27 @@ class AutoCleanupScheduler:
         Registra ação de limpeza no Neo4j
         """
 
-        cleanup_log = f"""
-        CREATE (log:CleanupLog {{
-            timestamp: datetime('{results["timestamp"]}'),
-            deleted_count: {results["actions"]["deleted"]},
-            archived_count: {results["actions"]["archived"]},
-            merged_count: {results["actions"]["merged"]},
-            refreshed_count: {results["actions"]["refreshed"]},
-            total_actions: {sum(results["actions"].values())}
-        }})
+        # Query fixa com parâmetros: o plano fica em cache entre ciclos
+        cleanup_log = """
+        CREATE (log:CleanupLog {
+            timestamp: datetime($timestamp),
+            deleted_count: $deleted,
+            archived_count: $archived,
+            merged_count: $merged,
+            refreshed_count: $refreshed,
+            total_actions: $total_actions
+        })
         RETURN log
         """
+        params = {
+            "timestamp": results["timestamp"],
+            **results["actions"],
+            "total_actions": sum(results["actions"].values())
+        }
 
-        # Em produção, executaria a query
+        connection = self.memory_system.connection
+        if connection is not None:
+            await connection.execute_query(cleanup_log, params)
         print(f"  📝 Limpeza registrada: {results['timestamp']}")
 
 
@@ -413,32 +725,43 @@ async def main():
     Demonstração do sistema de memória viva
     """
 
-    print("=" * 60)
+    print(SEPARATOR)
     print("🧠 SISTEMA DE MEMÓRIA VIVA PARA NEO4J")
-    print("=" * 60)
+    print(SEPARATOR)
 
     # Criar sistema
     memory_system = LivingMemorySystem()
     scheduler = AutoCleanupScheduler(memory_system)
 
+    # Regras, análise, candidatos e monitoramento não dependem entre si:
+    # disparar juntos e só depois imprimir na ordem de sempre. O TaskGroup
+    # cancela as demais tarefas assim que uma delas falha.
+    async with asyncio.TaskGroup() as tg:
+        rules_task = tg.create_task(memory_system.create_living_memory_rules())
+        health_task = tg.create_task(memory_system.analyze_memory_health())
+        candidates_task = tg.create_task(memory_system.identify_nodes_to_clean())
+        monitoring_task = tg.create_task(memory_system.monitor_memory_growth())
+
+    rules = rules_task.result()
+    health_queries = health_task.result()
+    candidates = candidates_task.result()
+    monitoring = monitoring_task.result()
+
     # 1. Definir regras
     print("\n📋 Definindo regras de memória viva...")
-    rules = await memory_system.create_living_memory_rules()
     print(f"  ✅ {len(rules['auto_cleanup_rules'])} regras de limpeza")
     print(f"  ✅ {len(rules['relevance_boosters'])} boosters de relevância")
     print(f"  ✅ {len(rules['connection_patterns'])} padrões de conexão")
 
     # 2. Analisar saúde atual
     print("\n🔍 Analisando saúde da memória...")
-    health_queries = await memory_system.analyze_memory_health()
     print(f"  📊 {len(health_queries)} tipos de análise disponíveis")
 
     # 3. Identificar problemas
     print("\n🎯 Identificando nós problemáticos...")
-    candidates = await memory_system.identify_nodes_to_clean()
-    for action, nodes in candidates.items():
-        if nodes:
-            print(f"  {action}: {len(nodes)} nós")
+    for action in ("delete", "archive", "merge", "update"):
+        if candidates[action]:
+            print(f"  {action}: {len(candidates[action])} nós")
 
     # 4. Executar limpeza
     print("\n🧹 Executando ciclo de limpeza...")
@@ -446,12 +769,11 @@ async def main():
 
     # 5. Monitorar crescimento
     print("\n📈 Métricas de monitoramento...")
-    monitoring = await memory_system.monitor_memory_growth()
     print(f"  ✅ {len(monitoring)} queries de monitoramento configuradas")
 
-    print("\n" + "=" * 60)
+    print(SECTION_BREAK)
     print("✨ Sistema de Memória Viva configurado com sucesso!")
-    print("=" * 60)
+    print(SEPARATOR)
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
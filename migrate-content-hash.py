@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Script para preencher content_sha1 nos nós Learning existentes
+Nós novos já recebem o hash na escrita (create_memory/update_memory)
+"""
+
+import logging
+
+from mcp_neo4j._content_hash import CONTENT_SHA1_INDEX
+from mcp_neo4j._driver import NEO4J_DATABASE, get_driver
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Índices usados pelos seeks de duplicate_nodes (living-memory-system.py)
+DUPLICATE_KEY_INDEXES = (
+    CONTENT_SHA1_INDEX,
+    "CREATE INDEX learning_name IF NOT EXISTS FOR (n:Learning) ON (n.name)",
+    "CREATE INDEX learning_taxonomy IF NOT EXISTS "
+    "FOR (n:Learning) ON (n.project, n.category, n.subcategory)",
+)
+
+def migrate_content_hash():
+    driver = get_driver()
+
+    with driver.session(database=NEO4J_DATABASE) as session:
+        for statement in DUPLICATE_KEY_INDEXES:
+            session.run(statement).consume()
+
+        # CALL ... IN TRANSACTIONS exige transação implícita (session.run)
+        summary = session.run("""
+            MATCH (n:Learning)
+            WHERE n.content_sha1 IS NULL OR size(n.content_sha1) <> 40
+            CALL {
+                WITH n
+                SET n.content_sha1 = apoc.util.sha1([coalesce(n.content, '')])
+            } IN TRANSACTIONS OF 5000 ROWS
+        """).consume()
+        logger.info(f"Hash gravado em {summary.counters.properties_set} nós")
+
+        record = session.run("""
+            MATCH (n:Learning)
+            WHERE n.content_sha1 IS NULL OR size(n.content_sha1) <> 40
+            RETURN count(n) as missing
+        """).single()
+        if record['missing']:
+            logger.warning(f"{record['missing']} nós ainda sem content_sha1")
+
+    logger.info("\n✅ Migração concluída!")
+
+if __name__ == "__main__":
+    migrate_content_hash()
@@ -4,55 +4,65 @@ Script para migrar labels Learning para Memory
 Mantém backup dos labels originais
 """
 
-from neo4j import GraphDatabase
 import logging
 
+from mcp_neo4j._driver import NEO4J_DATABASE, get_driver
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Configurações do Neo4j
-NEO4J_URI = "bolt://127.0.0.1:7687"
-NEO4J_USERNAME = "neo4j"
-NEO4J_PASSWORD = "password"
-NEO4J_DATABASE = "neo4j"
-
 def migrate_labels():
-    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USERNAME, NEO4J_PASSWORD))
+    driver = get_driver()
 
     with driver.session(database=NEO4J_DATABASE) as session:
-        # Contar nós antes
-        result = session.run("MATCH (l:Learning) RETURN count(l) as total")
-        learning_count = result.single()['total']
-        logger.info(f"Encontrados {learning_count} nós com label Learning")
-
-        # Adicionar label Memory mantendo Learning
+        # Contar nós antes (Memory sem Learning permite calcular o total final)
         result = session.run("""
-            MATCH (l:Learning)
-            SET l:Memory
-            RETURN count(l) as migrated
+            CALL { MATCH (l:Learning) RETURN count(l) as learning }
+            CALL { MATCH (l:Learning) WHERE NOT l:Memory RETURN count(l) as pending }
+            CALL { MATCH (m:Memory) WHERE NOT m:Learning RETURN count(m) as memory_only }
+            RETURN learning, pending, memory_only
         """)
-        migrated = result.single()['migrated']
+        record = result.single()
+        learning_count = record['learning']
+        pending_count = record['pending']
+        memory_only_count = record['memory_only']
+        logger.info(f"Encontrados {learning_count} nós com label Learning ({pending_count} pendentes)")
+
+        # Adicionar label Memory mantendo Learning, em commits de 10k nós;
+        # o filtro NOT l:Memory torna a migração idempotente ao reexecutar.
+        # CALL ... IN TRANSACTIONS exige transação implícita (session.run)
+        summary = session.run("""
+            MATCH (l:Learning)
+            WHERE NOT l:Memory
+            CALL {
+                WITH l
+                SET l:Memory
+            } IN TRANSACTIONS OF 10000 ROWS
+        """).consume()
+        migrated = summary.counters.labels_added
         logger.info(f"Migrados {migrated} nós - adicionado label Memory")
 
-        # Verificar resultado
-        result = session.run("MATCH (m:Memory) RETURN count(m) as total")
-        memory_count = result.single()['total']
+        # Verificar resultado e listar exemplos numa única ida ao servidor
+        record = session.run("""
+            CALL { MATCH (m:Memory) RETURN count(m) as total }
+            CALL {
+                MATCH (m:Memory)
+                WITH m LIMIT 3
+                RETURN collect({content: m.content, labels: labels(m)}) as examples
+            }
+            RETURN total, examples
+        """).single()
+        memory_count = record['total']
+        if migrated == pending_count and memory_count != memory_only_count + learning_count:
+            logger.warning("Contagem de Memory diverge do esperado após migração")
         logger.info(f"Total de nós com label Memory após migração: {memory_count}")
 
-        # Mostrar alguns exemplos
-        result = session.run("""
-            MATCH (m:Memory)
-            RETURN m.content as content, labels(m) as labels
-            LIMIT 3
-        """)
-
         logger.info("\nExemplos de nós migrados:")
-        for record in result:
-            content = record['content'][:50] if record['content'] else 'Sem conteúdo'
-            labels = record['labels']
+        for example in record['examples']:
+            content = example['content'][:50] if example['content'] else 'Sem conteúdo'
+            labels = example['labels']
             logger.info(f"  Labels: {labels} - Conteúdo: {content}...")
 
-    driver.close()
     logger.info("\n✅ Migração concluída!")
 
 if __name__ == "__main__":
@@ -0,0 +1,26 @@
+"""
+Hash de conteúdo compartilhado por servidor, scripts e migrações.
+"""
+import hashlib
+from typing import Any
+
+# Índice único para content_sha1; todos os pontos que agrupam por hash o usam
+CONTENT_SHA1_INDEX = (
+    "CREATE INDEX learning_sha1 IF NOT EXISTS FOR (n:Learning) ON (n.content_sha1)"
+)
+
+
+def content_sha1(content: Any) -> str:
+    """
+    Calcula o SHA-1 (hex, 40 caracteres) do conteúdo.
+
+    Igual ao apoc.util.sha1([coalesce(n.content, '')]) usado na migração,
+    para que hashes gravados em Python e no servidor agrupem juntos.
+
+    Args:
+        content: Conteúdo do nó (None vira string vazia)
+
+    Returns:
+        Digest SHA-1 em hexadecimal
+    """
+    return hashlib.sha1(str(content or "").encode("utf-8")).hexdigest()
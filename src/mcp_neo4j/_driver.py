@@ -0,0 +1,42 @@
+"""
+Driver Neo4j compartilhado pelos scripts do processo.
+"""
+import atexit
+import os
+from functools import lru_cache
+
+from neo4j import Driver, GraphDatabase
+
+NEO4J_URI = os.getenv("NEO4J_URI", "bolt://127.0.0.1:7687")
+NEO4J_USERNAME = os.getenv("NEO4J_USERNAME", "neo4j")
+NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "password")
+NEO4J_DATABASE = os.getenv("NEO4J_DATABASE", "neo4j")
+
+
+@lru_cache(maxsize=1)
+def get_driver() -> Driver:
+    """
+    Retorna o driver único do processo, criado na primeira chamada.
+
+    O pool de conexões é reaproveitado por todas as chamadas seguintes,
+    pagando handshake, autenticação e tabela de roteamento uma só vez.
+    O driver é fechado automaticamente ao final do processo.
+
+    Returns:
+        Driver Neo4j síncrono já aquecido
+    """
+    driver = GraphDatabase.driver(
+        NEO4J_URI,
+        auth=(NEO4J_USERNAME, NEO4J_PASSWORD),
+        max_connection_pool_size=50,
+        max_connection_lifetime=3600,
+        connection_acquisition_timeout=30,
+    )
+    atexit.register(driver.close)
+
+    # Pré-aquecer conexão e planner fora do caminho da primeira query real
+    with driver.session(database=NEO4J_DATABASE) as session:
+        session.run("RETURN 1").consume()
+        session.run("MATCH (n) WHERE false RETURN n LIMIT 0").consume()
+
+    return driver
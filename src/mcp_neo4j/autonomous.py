@@ -12,6 +12,29 @@ import json
 
 logger = logging.getLogger(__name__)
 
+# Queries executadas em loop, definidas uma única vez no módulo
+SAVE_PATTERN_QUERY = """
+MERGE (p:Pattern {type: $type})
+SET p += $props
+"""
+
+# MERGE pelo nome: reanálises atualizam a regra em vez de duplicá-la
+PREVENTION_RULE_QUERY = """
+MERGE (r:ProjectRules {name: 'auto_generated'})
+MERGE (rule:Rule {name: $props.name})
+ON CREATE SET rule = $props
+ON MATCH SET rule.frequency = $props.frequency,
+             rule.updated_at = $props.created_at
+MERGE (r)-[:HAS_RULE]->(rule)
+"""
+
+BEST_PRACTICE_QUERY = """
+MERGE (bp:BestPractice {name: $props.name})
+ON CREATE SET bp = $props
+ON MATCH SET bp.frequency = $props.frequency,
+             bp.updated_at = $props.created_at
+"""
+
 
 class AutonomousImprover:
     """Sistema autônomo que monitora e aprende continuamente"""
@@ -124,9 +147,22 @@ class AutonomousImprover:
     
     def check_new_entries(self) -> List[Dict]:
         """Verifica novas entradas desde última checagem"""
+        # Um ramo por label analisado em analyze_entry: cada um usa o
+        # índice de created_at (SchemaManager) em vez de varrer todos os nós
         query = """
-        MATCH (n)
-        WHERE n.created_at >= $last_check
+        CALL {
+            MATCH (n:Error)
+            WHERE n.created_at >= $last_check
+            RETURN n ORDER BY n.created_at DESC LIMIT 50
+            UNION
+            MATCH (n:SuccessfulExecution)
+            WHERE n.created_at >= $last_check
+            RETURN n ORDER BY n.created_at DESC LIMIT 50
+            UNION
+            MATCH (n:Documentation)
+            WHERE n.created_at >= $last_check
+            RETURN n ORDER BY n.created_at DESC LIMIT 50
+        }
         RETURN n, labels(n) as labels
         ORDER BY n.created_at DESC
         LIMIT 50
@@ -172,16 +208,19 @@ class AutonomousImprover:
         ORDER BY count DESC
         """
         
-        time_window = (datetime.now() - timedelta(hours=1)).isoformat()
+        now = datetime.now()
+        time_window = (now - timedelta(hours=1)).isoformat()
         results = self.conn.execute_query(query, {"time_window": time_window})
         
+        # Um único instante para toda a detecção, formatado uma vez
+        detected_at = now.isoformat()
         patterns = []
         for r in results:
             if r["count"] > 5:  # Padrão significativo
                 patterns.append({
                     "type": r["label"],
                     "frequency": r["count"],
-                    "detected_at": datetime.now().isoformat()
+                    "detected_at": detected_at
                 })
         
         return patterns
@@ -189,12 +228,8 @@ class AutonomousImprover:
     async def save_patterns(self, patterns: List[Dict]):
         """Salva padrões detectados"""
         for pattern in patterns:
-            query = """
-            MERGE (p:Pattern {type: $type})
-            SET p += $props
-            """
             self.conn.execute_query(
-                query,
+                SAVE_PATTERN_QUERY,
                 {"type": pattern["type"], "props": pattern}
             )
     
@@ -251,27 +286,35 @@ class AutonomousImprover:
     
     def consolidate_learnings(self) -> int:
         """Consolida aprendizados similares"""
+        # Agrupa por (task, success) mantendo o nó de menor elementId e remove
+        # os demais em sub-transações, sem acumular todo o delete em uma só
         query = """
-        MATCH (l1:Learning), (l2:Learning)
-        WHERE l1.task = l2.task 
-        AND elementId(l1) < elementId(l2)
-        AND l1.success = l2.success
-        WITH l1, collect(l2) as duplicates
-        WHERE size(duplicates) > 0
-        FOREACH (dup IN duplicates | DELETE dup)
-        RETURN count(duplicates) as consolidated
+        MATCH (l:Learning)
+        WHERE l.task IS NOT NULL AND l.success IS NOT NULL
+        WITH l ORDER BY elementId(l)
+        WITH l.task as task, l.success as success, collect(l) as learnings
+        WHERE size(learnings) > 1
+        UNWIND learnings[1..] as dup
+        CALL {
+            WITH dup
+            DETACH DELETE dup
+        } IN TRANSACTIONS OF 1000 ROWS
+        RETURN count(dup) as consolidated
         """
         
         results = self.conn.execute_query(query)
         return sum(r["consolidated"] for r in results)
     
     def remove_obsolete_data(self) -> int:
-        """Remove dados obsoletos"""
+        """Remove dados obsoletos gerados pelo próprio ciclo de execução"""
+        # Restrito aos labels transitórios: evita varrer todos os nós do grafo
         query = """
-        MATCH (n)
+        MATCH (n:Error|SuccessfulExecution|FailedExecution|AutonomousMode)
         WHERE n.created_at < $cutoff
-        AND NOT (n:ProjectRules OR n:Documentation OR n:Pattern)
-        DELETE n
+        CALL {
+            WITH n
+            DELETE n
+        } IN TRANSACTIONS OF 1000 ROWS
         RETURN count(n) as removed
         """
         
@@ -308,39 +351,31 @@ class AutonomousImprover:
     
     async def create_prevention_rules(self, patterns: List[Dict]):
         """Cria regras de prevenção baseadas em padrões de erro"""
+        created_at = datetime.now().isoformat()
         for pattern in patterns:
             rule = {
                 "name": f"prevent_{pattern['error_type']}",
                 "description": f"Prevenir erro: {pattern['error_type']}",
                 "frequency": pattern["frequency"],
-                "created_at": datetime.now().isoformat(),
+                "created_at": created_at,
                 "auto_generated": True
             }
             
-            query = """
-            MERGE (r:ProjectRules {name: 'auto_generated'})
-            CREATE (rule:Rule $props)
-            CREATE (r)-[:HAS_RULE]->(rule)
-            """
-            
-            self.conn.execute_query(query, {"props": rule})
+            self.conn.execute_query(PREVENTION_RULE_QUERY, {"props": rule})
     
     async def create_best_practices(self, patterns: List[Dict]):
         """Cria melhores práticas baseadas em padrões de sucesso"""
+        created_at = datetime.now().isoformat()
         for pattern in patterns:
             practice = {
                 "name": f"best_practice_{pattern['task_type']}",
                 "description": f"Melhor prática para: {pattern['task_type']}",
                 "frequency": pattern["frequency"],
-                "created_at": datetime.now().isoformat(),
+                "created_at": created_at,
                 "auto_generated": True
             }
             
-            query = """
-            CREATE (bp:BestPractice $props)
-            """
-            
-            self.conn.execute_query(query, {"props": practice})
+            self.conn.execute_query(BEST_PRACTICE_QUERY, {"props": practice})
     
     def stop(self):
         """Para o sistema autônomo"""
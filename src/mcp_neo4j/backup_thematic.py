@@ -7,14 +7,63 @@ Permite backups separados por tema/categoria com validação de integridade
 import json
 import hashlib
 import zipfile
+from collections import Counter
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Optional, Set, Tuple
 from neo4j import GraphDatabase
 import logging
 
+try:
+    import orjson
+except ImportError:  # orjson é opcional; sem ele usa-se o json da stdlib
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+JSON_SEPARATORS = (",", ":")
+
+
+def canonical_json(data) -> bytes:
+    """Serializa em JSON compacto e ordenado, já em bytes"""
+    return json.dumps(data, sort_keys=True, separators=JSON_SEPARATORS).encode()
+
+
+def load_json(data: bytes):
+    """Desserializa JSON, usando orjson quando disponível"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dump_json_pretty(data) -> bytes:
+    """Serializa JSON indentado (UTF-8), usando orjson quando disponível"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def join_json_arrays(first: bytes, second: bytes) -> bytes:
+    """Concatena dois arrays JSON compactos sem re-serializar"""
+    if first == b"[]":
+        return second
+    if second == b"[]":
+        return first
+    return first[:-1] + b"," + second[1:]
+
+
+# Agrupamentos inteligentes de temas relacionados (constantes do módulo)
+THEME_GROUPS = {
+    "learning_knowledge": ("Learning", "knowledge", "pattern", "insight", "lesson"),
+    "communication": ("message", "conversation", "interaction", "response"),
+    "technical": ("code", "bug", "error", "fix", "implementation", "technical"),
+    "project_work": ("project", "task", "feature", "requirement", "solution"),
+    "system_components": ("Component", "Agent", "System", "tool", "skill"),
+    "improvements": ("Improvement", "optimization", "enhancement", "update"),
+    "autonomous": ("autonomous", "self_improve", "decision", "rule"),
+    "general": ()  # Para itens não categorizados
+}
+
 
 class ThematicBackup:
     """Sistema de backup temático com validação de integridade"""
@@ -25,6 +74,13 @@ class ThematicBackup:
         self.backup_dir = Path.home() / "memory-backups-thematic"
         self.backup_dir.mkdir(exist_ok=True)
 
+    def _stream(self, query: str, params: Optional[Dict] = None):
+        """Itera registros sob demanda quando a conexão suporta streaming"""
+        stream = getattr(self.conn, "execute_stream", None)
+        if stream is None:
+            return self.conn.execute_query(query, params)
+        return stream(query, params)
+
     def analyze_themes(self) -> Dict[str, int]:
         """Analisa os temas/categorias existentes no Neo4j"""
         query = """
@@ -35,35 +91,11 @@ class ThematicBackup:
         ORDER BY count DESC
         """
 
-        results = self.conn.execute_query(query)
-        return {r['theme']: r['count'] for r in results}
+        return {r['theme']: r['count'] for r in self._stream(query)}
 
-    def get_smart_themes(self) -> Dict[str, List[str]]:
+    def get_smart_themes(self) -> Dict[str, Tuple[str, ...]]:
         """Define agrupamentos inteligentes de temas relacionados"""
-
-        # Análise de labels e propriedades
-        label_query = """
-        MATCH (n)
-        UNWIND labels(n) as label
-        RETURN DISTINCT label, count(n) as count
-        ORDER BY count DESC
-        """
-
-        labels = self.conn.execute_query(label_query)
-
-        # Definir agrupamentos inteligentes
-        theme_groups = {
-            "learning_knowledge": ["Learning", "knowledge", "pattern", "insight", "lesson"],
-            "communication": ["message", "conversation", "interaction", "response"],
-            "technical": ["code", "bug", "error", "fix", "implementation", "technical"],
-            "project_work": ["project", "task", "feature", "requirement", "solution"],
-            "system_components": ["Component", "Agent", "System", "tool", "skill"],
-            "improvements": ["Improvement", "optimization", "enhancement", "update"],
-            "autonomous": ["autonomous", "self_improve", "decision", "rule"],
-            "general": []  # Para itens não categorizados
-        }
-
-        return theme_groups
+        return dict(THEME_GROUPS)
 
     def backup_by_theme(self, theme_name: str, node_filters: List[str]) -> str:
         """
@@ -79,22 +111,15 @@ class ThematicBackup:
 
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 
-        # Buscar nós do tema
-        filter_conditions = []
-        for filter_item in node_filters:
-            filter_conditions.extend([
-                f"'{filter_item}' IN labels(n)",
-                f"n.category = '{filter_item}'",
-                f"n.type = '{filter_item}'",
-                f"n.topic = '{filter_item}'"
-            ])
-
-        where_clause = " OR ".join(filter_conditions) if filter_conditions else "TRUE"
-
-        # Query para nós e seus relacionamentos
-        nodes_query = f"""
+        # Query fixa para nós do tema e seus relacionamentos; os filtros
+        # vão como parâmetro para que o plano seja reaproveitado entre temas
+        nodes_query = """
         MATCH (n)
-        WHERE {where_clause}
+        WHERE size($filters) = 0
+           OR any(label IN labels(n) WHERE label IN $filters)
+           OR n.category IN $filters
+           OR n.type IN $filters
+           OR n.topic IN $filters
         OPTIONAL MATCH (n)-[r]-(m)
         RETURN
             n as node,
@@ -102,8 +127,6 @@ class ThematicBackup:
             collect(DISTINCT m) as connected_nodes
         """
 
-        results = self.conn.execute_query(nodes_query)
-
         # Estruturar dados do backup
         backup_data = {
             "metadata": {
@@ -122,27 +145,35 @@ class ThematicBackup:
             "integrity": {}
         }
 
-        # Processar resultados
+        # Processar resultados (listas e estatísticas ligadas a nomes locais)
+        nodes = backup_data['nodes']
+        relationships = backup_data['relationships']
+        statistics = backup_data['metadata']['statistics']
         seen_nodes = set()
         seen_relationships = set()
+        # Tipos contados durante a própria coleta, sem uma segunda passada nos nós
+        node_types = Counter()
 
-        for record in results:
+        # Consumir em streaming: o driver busca os próximos lotes enquanto processamos
+        for record in self._stream(nodes_query, {"filters": node_filters}):
             node = record['node']
             node_id = node.element_id
 
             if node_id not in seen_nodes:
-                backup_data['nodes'].append({
+                labels = list(node.labels)
+                nodes.append({
                     "id": node_id,
-                    "labels": list(node.labels),
+                    "labels": labels,
                     "properties": dict(node)
                 })
+                node_types.update(labels)
                 seen_nodes.add(node_id)
 
             # Adicionar relacionamentos
             for rel in record['relationships'] or []:
                 rel_id = rel.element_id
                 if rel_id not in seen_relationships:
-                    backup_data['relationships'].append({
+                    relationships.append({
                         "id": rel_id,
                         "type": rel.type,
                         "start": rel.start_node.element_id,
@@ -155,46 +186,41 @@ class ThematicBackup:
             for connected in record['connected_nodes'] or []:
                 conn_id = connected.element_id
                 if conn_id not in seen_nodes:
-                    backup_data['nodes'].append({
+                    labels = list(connected.labels)
+                    nodes.append({
                         "id": conn_id,
-                        "labels": list(connected.labels),
+                        "labels": labels,
                         "properties": dict(connected),
                         "connected_only": True  # Marca como nó conectado
                     })
+                    node_types.update(labels)
                     seen_nodes.add(conn_id)
 
         # Atualizar estatísticas
-        backup_data['metadata']['statistics']['total_nodes'] = len(backup_data['nodes'])
-        backup_data['metadata']['statistics']['total_relationships'] = len(backup_data['relationships'])
-
-        # Contar tipos de nós
-        for node in backup_data['nodes']:
-            for label in node['labels']:
-                backup_data['metadata']['statistics']['node_types'][label] = \
-                    backup_data['metadata']['statistics']['node_types'].get(label, 0) + 1
+        statistics['total_nodes'] = len(nodes)
+        statistics['total_relationships'] = len(relationships)
+        statistics['node_types'] = dict(node_types)
 
         # Calcular hash de integridade
-        content_str = json.dumps(backup_data['nodes'] + backup_data['relationships'],
-                                sort_keys=True)
-        content_hash = hashlib.sha256(content_str.encode()).hexdigest()
+        # Cada lista é serializada uma única vez; o hash total reusa os bytes
+        nodes_bytes = canonical_json(nodes)
+        relationships_bytes = canonical_json(relationships)
+        content_bytes = join_json_arrays(nodes_bytes, relationships_bytes)
+        content_hash = hashlib.sha256(content_bytes).hexdigest()
 
         backup_data['integrity'] = {
             "hash": content_hash,
             "algorithm": "SHA256",
-            "nodes_checksum": hashlib.md5(
-                json.dumps(backup_data['nodes'], sort_keys=True).encode()
-            ).hexdigest(),
-            "relationships_checksum": hashlib.md5(
-                json.dumps(backup_data['relationships'], sort_keys=True).encode()
-            ).hexdigest()
+            "nodes_checksum": hashlib.md5(nodes_bytes).hexdigest(),
+            "relationships_checksum": hashlib.md5(relationships_bytes).hexdigest()
         }
 
         # Salvar arquivo
         filename = f"THEME_{theme_name}_{timestamp}.json"
         filepath = self.backup_dir / filename
 
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(backup_data, f, indent=2, ensure_ascii=False)
+        with open(filepath, 'wb') as f:
+            f.write(dump_json_pretty(backup_data))
 
         # Criar ZIP com validação
         zip_name = f"THEME_{theme_name}_{timestamp}.zip"
@@ -286,7 +312,7 @@ class ThematicBackup:
         try:
             with zipfile.ZipFile(zip_path, 'r') as zf:
                 # Ler validação
-                validation_data = json.loads(zf.read("validation.json"))
+                validation_data = load_json(zf.read("validation.json"))
 
                 # Extrair e verificar dados
                 files = [f for f in zf.namelist() if f.endswith('.json') and f != 'validation.json']
@@ -296,14 +322,29 @@ class ThematicBackup:
                     return False
 
                 # Ler dados do backup
-                backup_data = json.loads(zf.read(files[0]))
+                backup_data = load_json(zf.read(files[0]))
+                nodes = backup_data['nodes']
+                relationships = backup_data['relationships']
+
+                # Contagens divergentes já provam corrupção, sem re-serializar nada
+                expected_counts = (
+                    validation_data.get('node_count', len(nodes)),
+                    validation_data.get('relationship_count', len(relationships))
+                )
+                if (len(nodes), len(relationships)) != expected_counts:
+                    logger.error(f"❌ Backup corrompido (contagens divergentes): {zip_path}")
+                    return False
 
                 # Recalcular hash
-                content_str = json.dumps(
-                    backup_data['nodes'] + backup_data['relationships'],
-                    sort_keys=True
-                )
-                calculated_hash = hashlib.sha256(content_str.encode()).hexdigest()
+                calculated_hash = hashlib.sha256(
+                    join_json_arrays(canonical_json(nodes), canonical_json(relationships))
+                ).hexdigest()
+
+                # Backups antigos usavam separadores padrão do json.dumps
+                if calculated_hash != validation_data['original_hash']:
+                    calculated_hash = hashlib.sha256(
+                        json.dumps(nodes + relationships, sort_keys=True).encode()
+                    ).hexdigest()
 
                 # Comparar
                 if calculated_hash == validation_data['original_hash']:
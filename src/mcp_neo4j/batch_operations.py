@@ -107,20 +107,49 @@ class BatchProcessor:
                 - to_label, to_name
                 - rel_type
                 - properties (opcional)
+        
+        Os relacionamentos são agrupados por par de labels para que cada
+        MATCH use o label (e o índice de name) em vez de varrer todos os nós.
         """
-        def create_batch(batch):
-            query = """
-            UNWIND $batch AS rel
-            MATCH (from) WHERE from.name = rel.from_name AND rel.from_label IN labels(from)
-            MATCH (to) WHERE to.name = rel.to_name AND rel.to_label IN labels(to)
-            CREATE (from)-[r:RELATED]->(to)
-            SET r = rel.properties
-            SET r.type = rel.rel_type
-            RETURN count(r) as created
-            """
-            return query, {"batch": batch}
+        def node_pattern(var: str, label: Optional[str]) -> str:
+            if not label:
+                return f"({var}) WHERE {var}.name = rel.{var}_name AND rel.{var}_label IN labels({var})"
+            escaped = label.replace("`", "``")
+            return f"({var}:`{escaped}` {{name: rel.{var}_name}})"
+        
+        groups: Dict[tuple, List[Dict]] = {}
+        for rel in relationships:
+            key = (rel.get("from_label"), rel.get("to_label"))
+            groups.setdefault(key, []).append(rel)
+        
+        results = []
+        for (from_label, to_label), group in groups.items():
+            def create_batch(batch, from_label=from_label, to_label=to_label):
+                query = f"""
+                UNWIND $batch AS rel
+                MATCH {node_pattern("from", from_label)}
+                MATCH {node_pattern("to", to_label)}
+                CREATE (from)-[r:RELATED]->(to)
+                SET r = rel.properties
+                SET r.type = rel.rel_type
+                RETURN count(r) as created
+                """
+                return query, {"batch": batch}
+            
+            results.append(self.process_in_batches(group, create_batch))
         
-        return self.process_in_batches(relationships, create_batch)
+        return self._merge_results(len(relationships), results)
+    
+    def _merge_results(self, total_items: int, results: List[Dict]) -> Dict:
+        """Combina estatísticas de várias chamadas a process_in_batches"""
+        return {
+            "total_items": total_items,
+            "processed": sum(r["processed"] for r in results),
+            "failed": sum(r["failed"] for r in results),
+            "batches": sum(r["batches"] for r in results),
+            "total_time": sum(r["total_time"] for r in results),
+            "average_batch_time": self.stats["average_batch_time"]
+        }
     
     def batch_update_nodes(self, label: str, updates: List[Dict]) -> Dict:
         """
@@ -145,10 +174,14 @@ class BatchProcessor:
     def batch_delete_nodes(self, label: str, names: List[str]) -> Dict:
         """Deleta múltiplos nós em batches"""
         def delete_batch(batch):
+            # Sub-transações limitam a memória ao remover nós muito conectados
             query = f"""
             MATCH (n:{label})
             WHERE n.name IN $batch
-            DETACH DELETE n
+            CALL {{
+                WITH n
+                DETACH DELETE n
+            }} IN TRANSACTIONS OF 100 ROWS
             RETURN count(n) as deleted
             """
             return query, {"batch": batch}
@@ -301,29 +334,20 @@ class TransactionBatcher:
         self.operations.append((query, params))
     
     def execute(self) -> List[Any]:
-        """Executa todas as operações em uma única transação"""
+        """Executa todas as operações em uma única transação (com retry do pool)"""
         if not self.operations:
             return []
         
-        results = []
-        
-        # Executar em uma única sessão/transação
-        with self.connection_pool.driver.session(database=self.connection_pool.database) as session:
-            with session.begin_transaction() as tx:
-                try:
-                    for query, params in self.operations:
-                        result = tx.run(query, params)
-                        results.append([dict(record) for record in result])
-                    
-                    tx.commit()
-                    logger.info(f"Transação com {len(self.operations)} operações commitada com sucesso")
-                    
-                except Exception as e:
-                    tx.rollback()
-                    logger.error(f"Erro na transação, rollback executado: {e}")
-                    raise
-                finally:
-                    self.operations.clear()
+        # O pool reexecuta a transação inteira em falhas transitórias (com
+        # circuit breaker); as operações só são descartadas ao final
+        try:
+            results = self.connection_pool.execute_transaction_with_retry(self.operations)
+            logger.info(f"Transação com {len(self.operations)} operações commitada com sucesso")
+        except Exception as e:
+            logger.error(f"Erro na transação, rollback executado: {e}")
+            raise
+        finally:
+            self.operations.clear()
         
         return results
     
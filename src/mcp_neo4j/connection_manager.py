@@ -130,14 +130,37 @@ class ConnectionPool:
                           max_retries: int = 3) -> List[Dict]:
         """Executa query com retry automático"""
         
+        def _run(session):
+            result = session.run(query, params or {})
+            return [dict(record) for record in result]
+        
+        return self._call_with_retry(_run, query, max_retries)
+    
+    def execute_transaction_with_retry(self, operations: List[tuple],
+                                       max_retries: int = 3) -> List[List[Dict]]:
+        """Executa várias queries numa única transação, com o mesmo retry e circuit breaker"""
+        
+        def _run(session):
+            with session.begin_transaction() as tx:
+                results = [
+                    [dict(record) for record in tx.run(query, params or {})]
+                    for query, params in operations
+                ]
+                tx.commit()
+                return results
+        
+        return self._call_with_retry(_run, operations[0][0], max_retries)
+    
+    def _call_with_retry(self, run, query: str, max_retries: int):
+        """Abre sessão, mede a execução e aplica circuit breaker e backoff"""
+        
         def _execute():
             self.ensure_connected()
             
             start_time = time.time()
             try:
                 with self.driver.session(database=self.database) as session:
-                    result = session.run(query, params or {})
-                    data = [dict(record) for record in result]
+                    data = run(session)
                     
                     # Métricas
                     elapsed = time.time() - start_time
@@ -5,7 +5,7 @@ Este módulo implementa a classe Neo4jMemory que gerencia entidades e relações
 no grafo de conhecimento usando AsyncDriver do Neo4j.
 """
 import logging
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from neo4j import AsyncDriver, RoutingControl
 
@@ -31,16 +31,46 @@ class Neo4jMemory:
 
     Attributes:
         driver: AsyncDriver do Neo4j
+        database: Database usado em todas as queries
     """
 
-    def __init__(self, neo4j_driver: AsyncDriver):
+    def __init__(self, neo4j_driver: AsyncDriver, database: Optional[str] = None):
         """
         Inicializa sistema de memória.
 
         Args:
             neo4j_driver: Driver assíncrono do Neo4j
+            database: Database alvo; informá-lo evita que o driver resolva
+                o home database a cada query
         """
         self.driver = neo4j_driver
+        self.database = database
+
+    async def create_constraints(self) -> None:
+        """
+        Cria constraint de unicidade para o nome das entidades.
+
+        O MERGE por nome usado em create_entities e os MATCH de relações
+        passam a usar o índice da constraint em vez de um label scan.
+        Usa o mesmo nome declarado pelo SchemaManager, então é safe
+        chamar múltiplas vezes (usa IF NOT EXISTS).
+        """
+        try:
+            query = """
+            CREATE CONSTRAINT memory_name_unique IF NOT EXISTS
+            FOR (m:Memory)
+            REQUIRE m.name IS UNIQUE
+            """
+            await self.driver.execute_query(
+                query,
+                routing_control=RoutingControl.WRITE,
+                database_=self.database,
+            )
+            logger.info("Constraint de nome criada/verificada")
+
+        except Exception as e:
+            # Pode falhar se já houver nomes duplicados no grafo
+            logger.warning(f"Não foi possível criar constraint de nome: {e}")
 
     async def create_fulltext_index(self) -> None:
         """
@@ -60,7 +90,8 @@ class Neo4jMemory:
             """
             await self.driver.execute_query(
                 query,
-                routing_control=RoutingControl.WRITE
+                routing_control=RoutingControl.WRITE,
+                database_=self.database,
             )
             logger.info("Índice fulltext criado/verificado")
 
@@ -106,7 +137,8 @@ class Neo4jMemory:
         result = await self.driver.execute_query(
             query,
             {"filter": filter_query},
-            routing_control=RoutingControl.READ
+            routing_control=RoutingControl.READ,
+            database_=self.database,
         )
 
         if not result.records:
@@ -158,17 +190,24 @@ class Neo4jMemory:
         """
         logger.info(f"Criando {len(entities)} entidades")
 
+        # Labels não podem ser parametrizados: agrupar por tipo e enviar
+        # um único UNWIND por label em vez de uma query por entidade
+        entities_by_type: Dict[str, List[Dict[str, Any]]] = {}
         for entity in entities:
+            entities_by_type.setdefault(entity.type, []).append(entity.model_dump())
+
+        for entity_type, batch in entities_by_type.items():
             query = f"""
-            WITH $entity as entity
+            UNWIND $entities as entity
             MERGE (e:Memory {{ name: entity.name }})
             SET e += entity {{ .type, .observations }}
-            SET e:`{entity.type}`
+            SET e:`{entity_type}`
             """
             await self.driver.execute_query(
                 query,
-                {"entity": entity.model_dump()},
-                routing_control=RoutingControl.WRITE
+                {"entities": batch},
+                routing_control=RoutingControl.WRITE,
+                database_=self.database,
             )
 
         logger.info(f"Criadas {len(entities)} entidades com sucesso")
@@ -193,19 +232,19 @@ class Neo4jMemory:
         """
         logger.info(f"Criando {len(relations)} relações")
 
-        for relation in relations:
+        for relation_type, batch in self._group_relations_by_type(relations).items():
             query = f"""
-            WITH $relation as relation
-            MATCH (from:Memory), (to:Memory)
-            WHERE from.name = relation.source
-            AND to.name = relation.target
-            MERGE (from)-[r:`{relation.relationType}`]->(to)
+            UNWIND $relations as relation
+            MATCH (from:Memory {{ name: relation.source }})
+            MATCH (to:Memory {{ name: relation.target }})
+            MERGE (from)-[r:`{relation_type}`]->(to)
             """
 
             await self.driver.execute_query(
                 query,
-                {"relation": relation.model_dump()},
-                routing_control=RoutingControl.WRITE
+                {"relations": batch},
+                routing_control=RoutingControl.WRITE,
+                database_=self.database,
             )
 
         logger.info(f"Criadas {len(relations)} relações com sucesso")
@@ -246,7 +285,8 @@ class Neo4jMemory:
         result = await self.driver.execute_query(
             query,
             {"observations": [obs.model_dump() for obs in observations]},
-            routing_control=RoutingControl.WRITE
+            routing_control=RoutingControl.WRITE,
+            database_=self.database,
         )
 
         results = [
@@ -281,7 +321,8 @@ class Neo4jMemory:
         await self.driver.execute_query(
             query,
             {"entities": entity_names},
-            routing_control=RoutingControl.WRITE
+            routing_control=RoutingControl.WRITE,
+            database_=self.database,
         )
 
         logger.info(f"Deletadas {len(entity_names)} entidades com sucesso")
@@ -313,7 +354,8 @@ class Neo4jMemory:
         await self.driver.execute_query(
             query,
             {"deletions": [deletion.model_dump() for deletion in deletions]},
-            routing_control=RoutingControl.WRITE
+            routing_control=RoutingControl.WRITE,
+            database_=self.database,
         )
 
         logger.info(f"Observações deletadas com sucesso")
@@ -333,23 +375,45 @@ class Neo4jMemory:
         """
         logger.info(f"Deletando {len(relations)} relações")
 
-        for relation in relations:
+        for relation_type, batch in self._group_relations_by_type(relations).items():
             query = f"""
-            WITH $relation as relation
-            MATCH (source:Memory)-[r:`{relation.relationType}`]->(target:Memory)
-            WHERE source.name = relation.source
-            AND target.name = relation.target
+            UNWIND $relations as relation
+            MATCH (source:Memory {{ name: relation.source }})
+                  -[r:`{relation_type}`]->
+                  (target:Memory {{ name: relation.target }})
             DELETE r
             """
 
             await self.driver.execute_query(
                 query,
-                {"relation": relation.model_dump()},
-                routing_control=RoutingControl.WRITE
+                {"relations": batch},
+                routing_control=RoutingControl.WRITE,
+                database_=self.database,
             )
 
         logger.info(f"Deletadas {len(relations)} relações com sucesso")
 
+    @staticmethod
+    def _group_relations_by_type(
+        relations: List[Relation]
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Agrupa relações por tipo para envio em lote via UNWIND.
+
+        Tipos de relação não podem ser parametrizados, então cada tipo
+        gera uma única query com todas as suas relações.
+
+        Args:
+            relations: Lista de relações
+
+        Returns:
+            Dicionário tipo -> lista de relações serializadas
+        """
+        grouped: Dict[str, List[Dict[str, Any]]] = {}
+        for relation in relations:
+            grouped.setdefault(relation.relationType, []).append(relation.model_dump())
+        return grouped
+
     async def read_graph(self) -> KnowledgeGraph:
         """
         Lê grafo de conhecimento completo.
@@ -392,51 +456,45 @@ class Neo4jMemory:
         """
         logger.info(f"Buscando {len(names)} memórias por nome")
 
+        # Entidades e relações em um único round trip
         query = """
         MATCH (e:Memory)
         WHERE e.name IN $names
-        RETURN e.name as name,
-               e.type as type,
-               e.observations as observations
+        OPTIONAL MATCH (e)-[r]-(:Memory)
+        RETURN collect(DISTINCT e { .name, .type, .observations }) as nodes,
+               collect(DISTINCT CASE WHEN r IS NOT NULL THEN {
+                   source: startNode(r).name,
+                   target: endNode(r).name,
+                   relationType: type(r)
+               } END) as relations
         """
 
-        result_nodes = await self.driver.execute_query(
+        result = await self.driver.execute_query(
             query,
             {"names": names},
-            routing_control=RoutingControl.READ
+            routing_control=RoutingControl.READ,
+            database_=self.database,
         )
 
-        entities: List[Entity] = []
-        for record in result_nodes.records:
-            entities.append(Entity(
-                name=record['name'],
-                type=record['type'],
-                observations=record.get('observations', [])
-            ))
-
-        # Buscar relações para entidades encontradas
-        relations: List[Relation] = []
-        if entities:
-            query = """
-            MATCH (source:Memory)-[r]->(target:Memory)
-            WHERE source.name IN $names OR target.name IN $names
-            RETURN source.name as source,
-                   target.name as target,
-                   type(r) as relationType
-            """
+        record = result.records[0] if result.records else {}
 
-            result_relations = await self.driver.execute_query(
-                query,
-                {"names": names},
-                routing_control=RoutingControl.READ
+        entities: List[Entity] = [
+            Entity(
+                name=node['name'],
+                type=node['type'],
+                observations=node.get('observations', [])
             )
+            for node in record.get('nodes', [])
+        ]
 
-            for record in result_relations.records:
-                relations.append(Relation(
-                    source=record["source"],
-                    target=record["target"],
-                    relationType=record["relationType"]
-                ))
+        relations: List[Relation] = [
+            Relation(
+                source=rel['source'],
+                target=rel['target'],
+                relationType=rel['relationType']
+            )
+            for rel in record.get('relations', [])
+        ]
 
         logger.info(f"Encontradas {len(entities)} entidades e {len(relations)} relações")
         return KnowledgeGraph(entities=entities, relations=relations)
@@ -28,9 +28,9 @@ class MemoryQueries:
             # Use with parameters: {"properties": {...}}
         """
         return f"""
+        WITH datetime() as now
         CREATE (n:{label} $properties)
-        SET n.created_at = datetime()
-        SET n.updated_at = datetime()
+        SET n.created_at = now, n.updated_at = now
         RETURN elementId(n) as id, n
         """
 
@@ -80,6 +80,7 @@ class MemoryQueries:
             Query Cypher que retorna estatísticas de saúde
         """
         return """
+        WITH datetime() - duration('P90D') as stale_cutoff
         CALL {
             MATCH (n:Learning)
             RETURN count(n) as total_nodes
@@ -90,8 +91,9 @@ class MemoryQueries:
             RETURN count(n) as isolated_count
         }
         CALL {
+            WITH stale_cutoff
             MATCH (n:Learning)
-            WHERE n.updated_at < datetime() - duration('P90D')
+            WHERE n.updated_at < stale_cutoff
             RETURN count(n) as stale_count
         }
         CALL {
@@ -158,15 +160,16 @@ class MemoryQueries:
             days: Dias sem atualização para considerar obsoleto
 
         Returns:
-            Query Cypher parametrizada
+            Query Cypher
         """
         return f"""
+        WITH datetime() as now
         MATCH (n:{label})
-        WHERE n.updated_at < datetime() - duration('P{{days}}D')
+        WHERE n.updated_at < now - duration({{days: {int(days)}}})
         RETURN elementId(n) as id,
                n.name as name,
                n.updated_at as updated_at,
-               duration.between(n.updated_at, datetime()).days as days_stale
+               duration.between(n.updated_at, now).days as days_stale
         ORDER BY n.updated_at ASC
         LIMIT 100
         """
@@ -1,31 +1,29 @@
-#!/usr/bin/env python3
 """
 MCP Neo4j Server Melhorado - Versão 2.0
 Com todas as melhorias baseadas nos aprendizados do projeto
+
+Executar como módulo: python -m mcp_neo4j.improved_server
 """
 
 import logging
 import os
-import sys
 import asyncio
 import threading
 from typing import Any, Optional, Dict, List
 from datetime import datetime
 
-# Adicionar path para imports locais
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-
 from mcp.server.fastmcp import FastMCP
 
 # Importar componentes melhorados
-from connection_manager import ConnectionPool, QueryCache, cached_query
-from query_builder import QueryBuilder, QueryTemplates, SchemaManager
-from batch_operations import BatchProcessor, BulkImporter, TransactionBatcher
+from .connection_manager import ConnectionPool, QueryCache, cached_query
+from .query_builder import QueryBuilder, QueryTemplates, SchemaManager
+from .batch_operations import BatchProcessor, BulkImporter, TransactionBatcher
+from .core.config import Neo4jConfig
 
 # Tentar importar componentes existentes
 try:
-    from self_improve import SelfImprover, get_context_before_action
-    from autonomous import AutonomousImprover, activate_autonomous_mode
+    from .self_improve import SelfImprover, get_context_before_action
+    from .autonomous import AutonomousImprover, activate_autonomous_mode
 except ImportError:
     SelfImprover = None
     AutonomousImprover = None
@@ -38,11 +36,15 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Configurações do Neo4j
-NEO4J_URI = os.getenv("NEO4J_URI", "bolt://127.0.0.1:7687")
-NEO4J_USERNAME = os.getenv("NEO4J_USERNAME", "neo4j")
-NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "password")
-NEO4J_DATABASE = os.getenv("NEO4J_DATABASE", "neo4j")
+# Configurações do Neo4j (snapshot único lido do ambiente no import)
+NEO4J_CONFIG = Neo4jConfig(
+    uri=os.getenv("NEO4J_URI", "bolt://127.0.0.1:7687"),
+    username=os.getenv("NEO4J_USERNAME", "neo4j"),
+    password=os.getenv("NEO4J_PASSWORD", "password"),
+    database=os.getenv("NEO4J_DATABASE", "neo4j"),
+)
+# Runtime paralelo do Neo4j 5 (Enterprise/Aura) para leituras analíticas
+NEO4J_PARALLEL_RUNTIME = os.getenv("NEO4J_PARALLEL_RUNTIME", "false").lower() == "true"
 
 # Criar servidor MCP
 mcp = FastMCP("neo4j-memory-v2")
@@ -51,6 +53,7 @@ mcp = FastMCP("neo4j-memory-v2")
 connection_pool = None
 batch_processor = None
 bulk_importer = None
+self_improver = None
 query_cache = QueryCache(max_size=100, ttl_seconds=300)
 
 
@@ -59,9 +62,9 @@ def get_connection_pool():
     global connection_pool
     if connection_pool is None:
         connection_pool = ConnectionPool(
-            uri=NEO4J_URI,
-            auth=(NEO4J_USERNAME, NEO4J_PASSWORD),
-            database=NEO4J_DATABASE
+            uri=NEO4J_CONFIG.uri,
+            auth=(NEO4J_CONFIG.username, NEO4J_CONFIG.password),
+            database=NEO4J_CONFIG.database
         )
         # Agendar warmup em background
         threading.Thread(target=warmup_connection, daemon=True).start()
@@ -84,15 +87,31 @@ def get_bulk_importer():
     return bulk_importer
 
 
+def get_self_improver():
+    """Obtém sistema de auto-melhoria, reaproveitado entre chamadas"""
+    global self_improver
+    if self_improver is None:
+        self_improver = SelfImprover(get_connection_pool())
+    return self_improver
+
+
 def warmup_connection():
     """Warmup da conexão em background"""
     try:
         pool = get_connection_pool()
         pool.execute_with_retry("RETURN 1 as test")
         
+        # Listar o schema existente e só enviar o que falta
+        existing = set()
+        try:
+            for show_query in ("SHOW INDEXES YIELD name RETURN name",
+                               "SHOW CONSTRAINTS YIELD name RETURN name"):
+                existing.update(r["name"] for r in pool.execute_with_retry(show_query))
+        except Exception as e:
+            logger.debug(f"Não foi possível listar o schema existente: {e}")
+        
         # Criar constraints e índices
-        schema_mgr = SchemaManager()
-        constraints = schema_mgr.create_constraints()
+        constraints = SchemaManager.pending_constraints(existing)
         for query, params in constraints:
             try:
                 pool.execute_with_retry(query, params)
@@ -104,6 +123,13 @@ def warmup_connection():
         logger.warning(f"Warmup falhou (não crítico): {e}")
 
 
+def analytic_query(query: str) -> str:
+    """Prefixa leituras analíticas com o runtime paralelo quando habilitado"""
+    if NEO4J_PARALLEL_RUNTIME:
+        return f"CYPHER runtime=parallel\n{query}"
+    return query
+
+
 # ============= FERRAMENTAS MCP MELHORADAS =============
 
 @mcp.tool()
@@ -128,6 +154,7 @@ def search_memories_v2(
     """
     pool = get_connection_pool()
     
+    # Cada ramo tem formato de linha fixo: a chave do nó é resolvida aqui, uma vez
     if query and use_fulltext:
         # Usar índice fulltext se disponível
         cypher = """
@@ -138,24 +165,26 @@ def search_memories_v2(
         LIMIT $limit
         """
         params = {"query": query, "limit": limit}
+        node_key, scored = "n", True
+    elif query:
+        cypher, params = QueryBuilder.search_nodes(label or "Memory", query, limit)
+        node_key, scored = "n", False
     else:
         # Query normal
         cypher, params = QueryTemplates.get_recent_memories(limit, label)
-        if query:
-            cypher, params = QueryBuilder.search_nodes(label or "Memory", query, limit)
+        node_key, scored = "m", False
     
     results = pool.execute_with_retry(cypher, params)
     
     # Processar resultados
     memories = []
     for record in results:
-        node = record.get("n") or record.get("node")
-        if node:
-            memories.append({
-                "labels": record.get("labels", []),
-                "properties": dict(node),
-                "score": record.get("score", 1.0)
-            })
+        node = record[node_key]
+        memories.append({
+            "labels": record["labels"] if scored else list(node.labels),
+            "properties": dict(node),
+            "score": record["score"] if scored else 1.0
+        })
     
     return memories
 
@@ -195,21 +224,28 @@ def create_memory_v2(
     if results:
         created_node = results[0]["n"]
         
-        # Criar conexões se especificadas
+        # Criar todas as conexões em uma única chamada
         if connect_to:
-            for target_id in connect_to:
-                try:
-                    rel_query = """
-                    MATCH (from), (to)
-                    WHERE elementId(from) = $from_id AND elementId(to) = $to_id
-                    CREATE (from)-[:RELATED {created_at: datetime()}]->(to)
-                    """
-                    pool.execute_with_retry(rel_query, {
-                        "from_id": created_node.element_id,
-                        "to_id": target_id
-                    })
-                except Exception as e:
-                    logger.warning(f"Não foi possível criar conexão com {target_id}: {e}")
+            rel_query = """
+            MATCH (from) WHERE elementId(from) = $from_id
+            WITH from, datetime() as now
+            UNWIND $to_ids AS to_id
+            MATCH (to) WHERE elementId(to) = to_id
+            CREATE (from)-[:RELATED {created_at: now}]->(to)
+            RETURN count(*) as created
+            """
+            try:
+                rel_results = pool.execute_with_retry(rel_query, {
+                    "from_id": created_node.element_id,
+                    "to_ids": connect_to
+                })
+                created = rel_results[0]["created"] if rel_results else 0
+                if created < len(connect_to):
+                    logger.warning(
+                        f"Apenas {created} de {len(connect_to)} conexões foram criadas"
+                    )
+            except Exception as e:
+                logger.warning(f"Não foi possível criar conexões: {e}")
         
         return {
             "id": created_node.element_id,
@@ -275,29 +311,31 @@ def save_learning(
         Aprendizado criado
     """
     pool = get_connection_pool()
+    batcher = TransactionBatcher(pool)
     
+    # Aprendizado e conexões como statements separados na mesma transação
     query, params = QueryTemplates.save_learning(title, description, tags)
-    results = pool.execute_with_retry(query, params)
+    batcher.add_operation(query, params)
+    
+    for memory_id in related_to or []:
+        batcher.add_operation("""
+        MATCH (l:Learning {name: $title}), (m)
+        WHERE elementId(m) = $memory_id
+        CREATE (l)-[:RELATES_TO {created_at: datetime()}]->(m)
+        """, {"title": title, "memory_id": memory_id})
+    
+    try:
+        results = batcher.execute()[0]
+    except Exception as e:
+        if not related_to:
+            raise
+        # Conexões não são críticas: salvar o aprendizado sem elas
+        logger.warning(f"Não foi possível conectar o aprendizado a {related_to}: {e}")
+        results = pool.execute_with_retry(query, params)
     
     if results:
         learning = results[0]["l"]
         
-        # Conectar a memórias relacionadas
-        if related_to:
-            for memory_id in related_to:
-                try:
-                    rel_query = """
-                    MATCH (l:Learning {name: $title}), (m)
-                    WHERE elementId(m) = $memory_id
-                    CREATE (l)-[:RELATES_TO {created_at: datetime()}]->(m)
-                    """
-                    pool.execute_with_retry(rel_query, {
-                        "title": title,
-                        "memory_id": memory_id
-                    })
-                except Exception as e:
-                    logger.warning(f"Não foi possível conectar ao ID {memory_id}: {e}")
-        
         return {
             "id": learning.element_id,
             "properties": dict(learning)
@@ -329,29 +367,30 @@ def save_bug_fix(
     similar_query, similar_params = QueryTemplates.find_similar_problems(problem)
     similar = pool.execute_with_retry(similar_query, similar_params)
     
-    # Salvar novo bug fix
+    # Salvar novo bug fix e conexões com similares em uma única transação
+    batcher = TransactionBatcher(pool)
     query, params = QueryTemplates.save_bug_fix(problem, solution, components)
-    results = pool.execute_with_retry(query, params)
+    batcher.add_operation(query, params)
+    
+    for sim_bug in similar:
+        batcher.add_operation("""
+        MATCH (b1:BugFix {name: $new_problem}), 
+              (b2:BugFix {name: $similar_problem})
+        CREATE (b1)-[:SIMILAR_TO {similarity: 'high'}]->(b2)
+        """, {"new_problem": problem, "similar_problem": sim_bug["b"]["name"]})
+    
+    try:
+        results = batcher.execute()[0]
+    except Exception as e:
+        if not similar:
+            raise
+        # Conexões com similares não são críticas: salvar o bug fix sem elas
+        logger.warning(f"Não foi possível conectar o bug fix a {len(similar)} similares: {e}")
+        results = pool.execute_with_retry(query, params)
     
     if results:
         bug_fix = results[0]["b"]
         
-        # Conectar a problemas similares se encontrados
-        if similar:
-            for sim_bug in similar:
-                try:
-                    rel_query = """
-                    MATCH (b1:BugFix {name: $new_problem}), 
-                          (b2:BugFix {name: $similar_problem})
-                    CREATE (b1)-[:SIMILAR_TO {similarity: 'high'}]->(b2)
-                    """
-                    pool.execute_with_retry(rel_query, {
-                        "new_problem": problem,
-                        "similar_problem": sim_bug["b"]["name"]
-                    })
-                except Exception:
-                    pass  # Não crítico
-        
         response = {
             "id": bug_fix.element_id,
             "properties": dict(bug_fix)
@@ -393,7 +432,7 @@ def get_graph_stats() -> Dict[str, Any]:
     } as graph_stats
     """
     
-    graph_results = pool.execute_with_retry(graph_query)
+    graph_results = pool.execute_with_retry(analytic_query(graph_query))
     
     # Combinar com métricas do sistema
     stats = {
@@ -486,7 +525,7 @@ if SelfImprover:
             Sugestões de melhoria
         """
         pool = get_connection_pool()
-        improver = SelfImprover(pool)
+        improver = get_self_improver()
         
         if context:
             full_context = get_context_before_action(pool, context)
@@ -532,8 +571,8 @@ if AutonomousImprover:
 def main():
     """Função principal"""
     logger.info("Iniciando servidor MCP Neo4j Memory v2.0...")
-    logger.info(f"Neo4j URI: {NEO4J_URI}")
-    logger.info(f"Database: {NEO4J_DATABASE}")
+    logger.info(f"Neo4j URI: {NEO4J_CONFIG.uri}")
+    logger.info(f"Database: {NEO4J_CONFIG.database}")
     
     # Iniciar warmup em background
     threading.Thread(target=warmup_connection, daemon=True).start()
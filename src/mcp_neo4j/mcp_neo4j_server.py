@@ -5,11 +5,15 @@ Servidor MCP para gerenciamento de memórias no Neo4j usando FastMCP
 """
 
 import logging
-from typing import Any, Optional, Dict, List
+import os
+from contextlib import contextmanager
+from typing import Any, Optional, Dict, Iterator, List
 from datetime import datetime
-from neo4j import GraphDatabase
+from neo4j import GraphDatabase, READ_ACCESS, WRITE_ACCESS
 from mcp.server.fastmcp import FastMCP
 
+from ._content_hash import content_sha1
+
 # Configurar logging para stderr (nunca stdout!)
 logging.basicConfig(
     level=logging.INFO,
@@ -26,6 +30,11 @@ NEO4J_URI = "bolt://localhost:7687"
 NEO4J_USERNAME = "neo4j"
 NEO4J_PASSWORD = "password"
 NEO4J_DATABASE = "neo4j"
+NEO4J_MAX_POOL_SIZE = 10
+NEO4J_ACQUISITION_TIMEOUT = 30.0
+
+# Stack trace completo nos erros de query (MCP_DEBUG_TB=0 registra só a mensagem)
+LOG_TRACEBACKS = os.getenv("MCP_DEBUG_TB", "1") == "1"
 
 
 class Neo4jConnection:
@@ -40,7 +49,9 @@ class Neo4jConnection:
         try:
             self.driver = GraphDatabase.driver(
                 NEO4J_URI,
-                auth=(NEO4J_USERNAME, NEO4J_PASSWORD)
+                auth=(NEO4J_USERNAME, NEO4J_PASSWORD),
+                max_connection_pool_size=NEO4J_MAX_POOL_SIZE,
+                connection_acquisition_timeout=NEO4J_ACQUISITION_TIMEOUT
             )
             self.driver.verify_connectivity()
             logger.info("Conectado ao Neo4j com sucesso")
@@ -48,25 +59,94 @@ class Neo4jConnection:
             logger.exception("Erro ao conectar com Neo4j")
             raise
     
-    def execute_query(self, query: str, params: Optional[Dict] = None) -> List[Dict]:
-        """Executa query no Neo4j e retorna resultados"""
+    @contextmanager
+    def session(self, access_mode: str = WRITE_ACCESS):
+        """Sessão no database configurado, com tratamento de erro único para as queries"""
         if not self.driver:
             self.connect()
         
         try:
-            with self.driver.session(database=NEO4J_DATABASE) as session:
-                result = session.run(query, params or {})
-                return [dict(record) for record in result]
-        except Exception:
-            logger.exception("Erro ao executar query")
+            with self.driver.session(
+                database=NEO4J_DATABASE,
+                default_access_mode=access_mode
+            ) as session:
+                yield session
+        except Exception as e:
+            logger.error("Erro ao executar query: %s", e, exc_info=LOG_TRACEBACKS)
             raise
     
+    def execute_query(self, query: str, params: Optional[Dict] = None) -> List[Dict]:
+        """Executa query no Neo4j e retorna resultados"""
+        with self.session() as session:
+            result = session.run(query, params or {})
+            return [dict(record) for record in result]
+    
+    def execute_write(self, query: str, params: Optional[Dict] = None) -> List[Dict]:
+        """Executa escrita em transação gerenciada (com retry), roteada para o líder"""
+        with self.session(WRITE_ACCESS) as session:
+            return session.execute_write(
+                lambda tx: [dict(record) for record in tx.run(query, params or {})]
+            )
+    
+    def execute_stream(self, query: str, params: Optional[Dict] = None,
+                       access_mode: str = WRITE_ACCESS) -> Iterator[Dict]:
+        """Executa query consumindo os registros sob demanda, sem materializar a lista"""
+        with self.session(access_mode) as session:
+            for record in session.run(query, params or {}):
+                yield dict(record)
+    
     def close(self):
         """Fecha conexão com Neo4j"""
         if self.driver:
             self.driver.close()
 
 
+# Orientações estáticas de uso, montadas uma única vez no import
+GUIDANCE = {
+    "connections": """
+    CONEXÕES E RELACIONAMENTOS:
+    - Use create_connection para ligar memórias
+    - Tipos comuns: KNOWS, WORKS_ON, LIVES_IN, HAS_SKILL
+    - Adicione propriedades como 'since', 'role', 'status'
+    - Exemplo: pessoa KNOWS pessoa, pessoa WORKS_ON projeto
+    """,
+    "labels": """
+    LABELS RECOMENDADOS:
+    - person: Pessoas e contatos
+    - project: Projetos e iniciativas
+    - organization: Empresas e organizações
+    - skill: Habilidades e competências
+    - event: Eventos e reuniões
+    - idea: Ideias e conceitos
+    - task: Tarefas e atividades
+    """,
+    "best-practices": """
+    MELHORES PRÁTICAS:
+    - Sempre use 'name' como identificador principal
+    - Adicione timestamps com created_at/updated_at
+    - Conecte memórias relacionadas
+    - Use labels descritivos e consistentes
+    - Evite duplicação: busque antes de criar
+    """,
+    "default": """
+    SISTEMA DE MEMÓRIA NEO4J:
+    
+    Ferramentas disponíveis:
+    - search_memories: Buscar memórias existentes
+    - create_memory: Criar nova memória
+    - create_connection: Conectar memórias
+    - update_memory: Atualizar propriedades
+    - delete_memory: Remover memória
+    - list_memory_labels: Ver todos os labels
+    
+    Use get_guidance(topic) para mais detalhes sobre:
+    - connections: Como criar conexões
+    - labels: Labels recomendados
+    - best-practices: Melhores práticas
+    """
+}
+
+
 # Instância global da conexão
 neo4j_conn = Neo4jConnection()
 
@@ -119,10 +199,8 @@ def search_memories(
     
     cypher += " RETURN n, labels(n) as labels LIMIT $limit"
     
-    results = neo4j_conn.execute_query(cypher, params)
-    
     memories = []
-    for record in results:
+    for record in neo4j_conn.execute_stream(cypher, params, access_mode=READ_ACCESS):
         node = record["n"]
         memory = {
             "id": node.element_id if hasattr(node, 'element_id') else node.id,
@@ -155,13 +233,15 @@ def create_memory(
     # Adicionar timestamps
     properties["created_at"] = datetime.now().isoformat()
     properties["updated_at"] = datetime.now().isoformat()
+    if "content" in properties:
+        properties["content_sha1"] = content_sha1(properties["content"])
     
     cypher = f"""
     CREATE (n:{label} $props)
     RETURN n, labels(n) as labels, elementId(n) as id
     """
     
-    results = neo4j_conn.execute_query(cypher, {"props": properties})
+    results = neo4j_conn.execute_write(cypher, {"props": properties})
     
     if results:
         record = results[0]
@@ -209,7 +289,7 @@ def create_connection(
         "props": props
     }
     
-    results = neo4j_conn.execute_query(cypher, params)
+    results = neo4j_conn.execute_write(cypher, params)
     
     if results:
         return {
@@ -238,6 +318,8 @@ def update_memory(
         Memória atualizada
     """
     properties["updated_at"] = datetime.now().isoformat()
+    if "content" in properties:
+        properties["content_sha1"] = content_sha1(properties["content"])
     
     cypher = """
     MATCH (n)
@@ -246,7 +328,7 @@ def update_memory(
     RETURN n, labels(n) as labels
     """
     
-    results = neo4j_conn.execute_query(
+    results = neo4j_conn.execute_write(
         cypher, 
         {"node_id": node_id, "props": properties}
     )
@@ -280,7 +362,7 @@ def delete_memory(node_id: str) -> Dict[str, str]:
     RETURN count(n) as deleted
     """
     
-    results = neo4j_conn.execute_query(cypher, {"node_id": node_id})
+    results = neo4j_conn.execute_write(cypher, {"node_id": node_id})
     
     if results and results[0]["deleted"] > 0:
         return {"status": "success", "message": f"Memória {node_id} deletada"}
@@ -296,20 +378,31 @@ def list_memory_labels() -> List[Dict[str, Any]]:
     Returns:
         Lista de labels com contagem de nós
     """
-    cypher = """
-    MATCH (n)
-    WITH labels(n) as node_labels
-    UNWIND node_labels as label
-    RETURN label, COUNT(*) as count
-    ORDER BY count DESC
-    """
-    
-    results = neo4j_conn.execute_query(cypher)
-    
-    return [
-        {"label": r["label"], "count": r["count"]} 
-        for r in results
-    ]
+    # As duas consultas reutilizam a mesma sessão de leitura
+    with neo4j_conn.session(READ_ACCESS) as session:
+        labels = [
+            r["label"]
+            for r in session.run("CALL db.labels() YIELD label RETURN label")
+        ]
+        if not labels:
+            return []
+        
+        # count(n) com label fixo é servido pelo count store, sem varrer os nós
+        branches = [
+            "MATCH (n:`{}`) RETURN $labels[{}] as label, count(n) as count".format(
+                label.replace("`", "``"), i
+            )
+            for i, label in enumerate(labels)
+        ]
+        cypher = (
+            "CALL {\n" + "\nUNION ALL\n".join(branches) + "\n}\n"
+            "RETURN label, count ORDER BY count DESC"
+        )
+        
+        return [
+            {"label": r["label"], "count": r["count"]} 
+            for r in session.run(cypher, {"labels": labels})
+        ]
 
 
 @mcp.tool()
@@ -323,54 +416,10 @@ def get_guidance(topic: Optional[str] = None) -> str:
     Returns:
         Texto com orientações
     """
-    guidance = {
-        "connections": """
-        CONEXÕES E RELACIONAMENTOS:
-        - Use create_connection para ligar memórias
-        - Tipos comuns: KNOWS, WORKS_ON, LIVES_IN, HAS_SKILL
-        - Adicione propriedades como 'since', 'role', 'status'
-        - Exemplo: pessoa KNOWS pessoa, pessoa WORKS_ON projeto
-        """,
-        "labels": """
-        LABELS RECOMENDADOS:
-        - person: Pessoas e contatos
-        - project: Projetos e iniciativas
-        - organization: Empresas e organizações
-        - skill: Habilidades e competências
-        - event: Eventos e reuniões
-        - idea: Ideias e conceitos
-        - task: Tarefas e atividades
-        """,
-        "best-practices": """
-        MELHORES PRÁTICAS:
-        - Sempre use 'name' como identificador principal
-        - Adicione timestamps com created_at/updated_at
-        - Conecte memórias relacionadas
-        - Use labels descritivos e consistentes
-        - Evite duplicação: busque antes de criar
-        """,
-        "default": """
-        SISTEMA DE MEMÓRIA NEO4J:
-        
-        Ferramentas disponíveis:
-        - search_memories: Buscar memórias existentes
-        - create_memory: Criar nova memória
-        - create_connection: Conectar memórias
-        - update_memory: Atualizar propriedades
-        - delete_memory: Remover memória
-        - list_memory_labels: Ver todos os labels
-        
-        Use get_guidance(topic) para mais detalhes sobre:
-        - connections: Como criar conexões
-        - labels: Labels recomendados
-        - best-practices: Melhores práticas
-        """
-    }
-    
-    if topic and topic in guidance:
-        return guidance[topic]
+    if topic and topic in GUIDANCE:
+        return GUIDANCE[topic]
     
-    return guidance["default"]
+    return GUIDANCE["default"]
 
 
 # Executar servidor
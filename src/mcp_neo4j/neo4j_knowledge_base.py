@@ -4,40 +4,107 @@ Base de Conhecimento Neo4j - Sistema de Consulta
 Acesso rápido ao conhecimento armazenado no grafo
 """
 
+import argparse
+import asyncio
+import logging
+import os
 import subprocess
 import sys
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Prefixo fixo do cypher-shell via Docker, montado uma única vez
+CYPHER_SHELL = (
+    'docker', 'exec', '-i', 'terminal-neo4j',
+    'cypher-shell', '-u', 'neo4j', '-p', 'password',
+    '--format', 'plain'
+)
+
+def cypher_command(query):
+    """Monta o comando cypher-shell via Docker"""
+    return [*CYPHER_SHELL, query]
 
 def execute_cypher(query):
     """Executa query Cypher via Docker"""
-    cmd = [
-        'docker', 'exec', '-i', 'terminal-neo4j',
-        'cypher-shell', '-u', 'neo4j', '-p', 'password',
-        '--format', 'plain', query
-    ]
-    
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        return result.stdout
+        # Bytes crus: stdout é decodificado uma vez e stderr só em caso de erro
+        result = subprocess.run(cypher_command(query), capture_output=True, check=True)
+        return result.stdout.decode()
     except subprocess.CalledProcessError as e:
-        print(f"❌ Erro: {e.stderr}")
+        logger.error("❌ Erro: %s", e.stderr.decode(errors="replace"))
+        logger.debug("Stack da falha", exc_info=True)
         return None
 
+def stream_cypher(query):
+    """Executa query Cypher via Docker, entregando as linhas conforme chegam"""
+    with subprocess.Popen(
+        cypher_command(query),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True
+    ) as process:
+        # stderr é drenado em paralelo: se o buffer do pipe enchesse enquanto
+        # só stdout é lido, o cypher-shell travaria esperando a leitura
+        stderr_lines = []
+        drain = threading.Thread(
+            target=lambda: stderr_lines.extend(process.stderr), daemon=True
+        )
+        drain.start()
+        yield from process.stdout
+        drain.join()
+    if process.returncode != 0:
+        logger.error("❌ Erro: %s", "".join(stderr_lines))
+
+def print_cypher(query):
+    """Imprime o resultado de uma query sem acumular a saída inteira em memória"""
+    for line in stream_cypher(query):
+        sys.stdout.write(line)
+
+async def _execute_cypher_async(query):
+    """Executa query Cypher via Docker sem bloquear o event loop"""
+    process = await asyncio.create_subprocess_exec(
+        *cypher_command(query),
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        logger.error("❌ Erro: %s", stderr.decode())
+        return None
+    return stdout.decode()
+
+def execute_cypher_many(*queries):
+    """Executa queries independentes em paralelo, cada uma em seu processo"""
+    async def run_all():
+        return await asyncio.gather(*(_execute_cypher_async(q) for q in queries))
+    return asyncio.run(run_all())
+
+# Texto do menu montado uma única vez e escrito numa só chamada
+MENU_TEXT = "\n".join([
+    "",
+    "=" * 60,
+    "🧠 BASE DE CONHECIMENTO NEO4J",
+    "=" * 60,
+    "",
+    "📚 CONSULTAS DISPONÍVEIS:",
+    "",
+    "1. Ver toda documentação",
+    "2. Buscar exemplos Python",
+    "3. Ver comandos Cypher",
+    "4. Listar padrões de modelagem",
+    "5. Estatísticas do grafo",
+    "6. Buscar por palavra-chave",
+    "7. Ver configuração MCP",
+    "8. Query customizada",
+    "0. Sair",
+    "",
+    "-" * 60,
+]) + "\n"
+
 def menu():
     """Menu interativo para consultar conhecimento"""
-    print("\n" + "="*60)
-    print("🧠 BASE DE CONHECIMENTO NEO4J")
-    print("="*60)
-    print("\n📚 CONSULTAS DISPONÍVEIS:\n")
-    print("1. Ver toda documentação")
-    print("2. Buscar exemplos Python")
-    print("3. Ver comandos Cypher")
-    print("4. Listar padrões de modelagem")
-    print("5. Estatísticas do grafo")
-    print("6. Buscar por palavra-chave")
-    print("7. Ver configuração MCP")
-    print("8. Query customizada")
-    print("0. Sair")
-    print("\n" + "-"*60)
+    sys.stdout.write(MENU_TEXT)
 
 def view_documentation():
     """Visualizar toda documentação"""
@@ -47,7 +114,7 @@ def view_documentation():
     ORDER BY d.created_at DESC
     """
     print("\n📖 DOCUMENTAÇÃO DISPONÍVEL:")
-    print(execute_cypher(query))
+    print_cypher(query)
 
 def view_python_examples():
     """Ver exemplos Python"""
@@ -58,7 +125,7 @@ def view_python_examples():
     ORDER BY ex.created_at DESC
     """
     print("\n🐍 EXEMPLOS PYTHON:")
-    print(execute_cypher(query))
+    print_cypher(query)
 
 def view_cypher_commands():
     """Ver comandos Cypher"""
@@ -68,7 +135,7 @@ def view_cypher_commands():
     ORDER BY cmd.category, cmd.name
     """
     print("\n⚡ COMANDOS CYPHER:")
-    print(execute_cypher(query))
+    print_cypher(query)
 
 def view_modeling_patterns():
     """Ver padrões de modelagem"""
@@ -90,9 +157,6 @@ def view_statistics():
     ORDER BY count DESC
     LIMIT 20
     """
-    print("\n📊 ESTATÍSTICAS DO GRAFO:")
-    print(execute_cypher(query))
-    
     # Total de nós e relacionamentos
     total_query = """
     MATCH (n)
@@ -100,8 +164,13 @@ def view_statistics():
     MATCH ()-[r]->()
     RETURN nodes as Total_Nós, COUNT(r) as Total_Relacionamentos
     """
+    
+    # As duas consultas são independentes: disparar juntas
+    stats, totals = execute_cypher_many(query, total_query)
+    print("\n📊 ESTATÍSTICAS DO GRAFO:")
+    print(stats)
     print("\n📈 TOTAIS:")
-    print(execute_cypher(total_query))
+    print(totals)
 
 def search_keyword(keyword):
     """Buscar por palavra-chave"""
@@ -127,52 +196,86 @@ def view_mcp_config():
     RETURN c.name as Config, c.status as Status, c.docker_container as Container
     """
     print("\n⚙️ CONFIGURAÇÃO MCP:")
-    print(execute_cypher(query))
+    print_cypher(query)
 
-def custom_query():
+def custom_query(query=None):
     """Executar query customizada"""
-    print("\n💡 Digite sua query Cypher (ou 'voltar' para cancelar):")
-    query = input("> ")
+    if query is None:
+        print("\n💡 Digite sua query Cypher (ou 'voltar' para cancelar):")
+        query = input("> ")
     if query.lower() != 'voltar':
         print("\n📋 RESULTADO:")
-        result = execute_cypher(query)
-        if result:
-            print(result)
+        print_cypher(query)
+
+# Opções sem argumentos, resolvidas uma única vez em tabela de despacho
+MENU_ACTIONS = {
+    '1': view_documentation,
+    '2': view_python_examples,
+    '3': view_cypher_commands,
+    '4': view_modeling_patterns,
+    '5': view_statistics,
+    '7': view_mcp_config,
+}
+
+def run_option(choice, keyword=None, query=None):
+    """Executa uma opção do menu; retorna False se a opção for inválida"""
+    action = MENU_ACTIONS.get(choice)
+    if action is not None:
+        action()
+    elif choice == '6':
+        if keyword is None:
+            keyword = input("\n🔍 Digite a palavra-chave: ")
+        search_keyword(keyword)
+    elif choice == '8':
+        custom_query(query)
+    else:
+        return False
+    return True
+
+def parse_args(argv=None):
+    """Argumentos para uso não interativo (cron, CI, MCP)"""
+    parser = argparse.ArgumentParser(description="Base de Conhecimento Neo4j")
+    parser.add_argument("--option", choices=[str(i) for i in range(1, 9)],
+                        help="Executa uma opção do menu e sai")
+    parser.add_argument("--keyword", help="Palavra-chave para a opção 6")
+    parser.add_argument("--query", help="Query Cypher para a opção 8")
+    return parser.parse_args(argv)
 
 # Loop principal
-def main():
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.option is not None:
+        if args.option == '6' and args.keyword is None:
+            print("⚠️ A opção 6 requer --keyword", file=sys.stderr)
+            sys.exit(2)
+        if args.option == '8' and args.query is None:
+            print("⚠️ A opção 8 requer --query", file=sys.stderr)
+            sys.exit(2)
+        run_option(args.option, args.keyword, args.query)
+        return
+
+    # Sem terminal não há quem responda ao menu: não bloquear em input()
+    if not sys.stdin.isatty():
+        print("⚠️ Sem terminal interativo; use --option", file=sys.stderr)
+        sys.exit(2)
+
     while True:
         menu()
         choice = input("\n👉 Escolha uma opção: ")
-        
-        if choice == '1':
-            view_documentation()
-        elif choice == '2':
-            view_python_examples()
-        elif choice == '3':
-            view_cypher_commands()
-        elif choice == '4':
-            view_modeling_patterns()
-        elif choice == '5':
-            view_statistics()
-        elif choice == '6':
-            keyword = input("\n🔍 Digite a palavra-chave: ")
-            search_keyword(keyword)
-        elif choice == '7':
-            view_mcp_config()
-        elif choice == '8':
-            custom_query()
-        elif choice == '0':
+
+        if choice == '0':
             print("\n👋 Até logo!")
             sys.exit(0)
-        else:
+        elif not run_option(choice):
             print("\n⚠️ Opção inválida!")
-        
+
         input("\n[Enter para continuar...]")
 
 if __name__ == "__main__":
+    logging.basicConfig(level=os.getenv("LOGLEVEL", "INFO"), format="%(message)s")
     try:
         main()
     except KeyboardInterrupt:
         print("\n\n👋 Saindo...")
-        sys.exit(0)
\ No newline at end of file
+        sys.exit(0)
@@ -5,96 +5,97 @@ Salvando conhecimento no grafo para referência futura
 """
 
 import subprocess
+import sys
 import json
 from datetime import datetime
 
+# Prefixo fixo do cypher-shell via Docker, montado uma única vez
+CYPHER_SHELL = (
+    'docker', 'exec', '-i', 'terminal-neo4j',
+    'cypher-shell', '-u', 'neo4j', '-p', 'password',
+    '--format', 'plain'
+)
+
+# Mensagens acumuladas e escritas de uma vez no final, sem flush entre as queries
+output = []
+
 def execute_cypher(query):
     """Executa query Cypher via Docker"""
-    cmd = [
-        'docker', 'exec', '-i', 'terminal-neo4j',
-        'cypher-shell', '-u', 'neo4j', '-p', 'password',
-        '--format', 'plain', query
-    ]
-    
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        return result.stdout
+        # Bytes crus: stdout é decodificado uma vez e stderr só em caso de erro
+        result = subprocess.run([*CYPHER_SHELL, query], capture_output=True, check=True)
+        return result.stdout.decode()
     except subprocess.CalledProcessError as e:
-        print(f"❌ Erro: {e.stderr}")
+        output.append(f"❌ Erro: {e.stderr.decode(errors='replace')}")
         return None
 
 # Salvar exemplos práticos no Neo4j
-print("📚 Salvando Exemplos Práticos de Python + Neo4j...")
+output.append("📚 Salvando Exemplos Práticos de Python + Neo4j...")
+
+# Constraints garantem que os MERGE por nome usem índice, não label scan
+for constraint in (
+    "CREATE CONSTRAINT python_example_name_unique IF NOT EXISTS "
+    "FOR (ex:PythonExample) REQUIRE ex.name IS UNIQUE",
+    "CREATE CONSTRAINT modeling_pattern_name_unique IF NOT EXISTS "
+    "FOR (pat:ModelingPattern) REQUIRE pat.name IS UNIQUE",
+):
+    execute_cypher(constraint)
 
 # 1. Exemplo de CRUD completo
 crud_example = """
-// Criar exemplo de CRUD Python
-CREATE (ex:PythonExample {
-  type: 'CRUD_Operations',
-  name: 'Operações CRUD com Neo4j Python',
-  created_at: datetime(),
-  description: 'Exemplo completo de Create, Read, Update, Delete'
-})
+// Criar exemplo de CRUD Python (reexecuções atualizam em vez de duplicar)
+MERGE (ex:PythonExample {name: 'Operações CRUD com Neo4j Python'})
+ON CREATE SET ex.created_at = datetime()
+ON MATCH SET ex.updated_at = datetime()
+SET ex.type = 'CRUD_Operations',
+    ex.description = 'Exemplo completo de Create, Read, Update, Delete'
 
 // Código Create
-CREATE (create:CodeSnippet {
-  operation: 'CREATE',
-  code: 'driver.execute_query(
+MERGE (ex)-[:HAS_SNIPPET]->(create:CodeSnippet {operation: 'CREATE'})
+SET create.code = 'driver.execute_query(
     "CREATE (p:Person {name: $name, age: $age}) RETURN p",
     name="João", age=30
 )',
-  description: 'Criar novo nó Person'
-})
+    create.description = 'Criar novo nó Person'
 
 // Código Read
-CREATE (read:CodeSnippet {
-  operation: 'READ',
-  code: 'driver.execute_query(
+MERGE (ex)-[:HAS_SNIPPET]->(read:CodeSnippet {operation: 'READ'})
+SET read.code = 'driver.execute_query(
     "MATCH (p:Person) WHERE p.age > $min_age RETURN p.name, p.age",
     min_age=25
 )',
-  description: 'Buscar pessoas por idade'
-})
+    read.description = 'Buscar pessoas por idade'
 
 // Código Update
-CREATE (update:CodeSnippet {
-  operation: 'UPDATE',
-  code: 'driver.execute_query(
+MERGE (ex)-[:HAS_SNIPPET]->(update:CodeSnippet {operation: 'UPDATE'})
+SET update.code = 'driver.execute_query(
     "MATCH (p:Person {name: $name}) SET p.age = $new_age RETURN p",
     name="João", new_age=31
 )',
-  description: 'Atualizar idade da pessoa'
-})
+    update.description = 'Atualizar idade da pessoa'
 
 // Código Delete
-CREATE (delete:CodeSnippet {
-  operation: 'DELETE',
-  code: 'driver.execute_query(
+MERGE (ex)-[:HAS_SNIPPET]->(delete:CodeSnippet {operation: 'DELETE'})
+SET delete.code = 'driver.execute_query(
     "MATCH (p:Person {name: $name}) DETACH DELETE p",
     name="João"
 )',
-  description: 'Deletar pessoa e seus relacionamentos'
-})
-
-// Relacionar exemplos
-CREATE (ex)-[:HAS_SNIPPET]->(create)
-CREATE (ex)-[:HAS_SNIPPET]->(read)
-CREATE (ex)-[:HAS_SNIPPET]->(update)
-CREATE (ex)-[:HAS_SNIPPET]->(delete)
+    delete.description = 'Deletar pessoa e seus relacionamentos'
 
 RETURN ex.name as exemplo, COUNT{(ex)-[:HAS_SNIPPET]->()} as snippets
 """
 
 result = execute_cypher(crud_example)
 if result:
-    print(f"✅ CRUD Example: {result.strip()}")
+    output.append(f"✅ CRUD Example: {result.strip()}")
 
 # 2. Exemplo de Transações
 transaction_example = """
-CREATE (ex:PythonExample {
+MERGE (ex:PythonExample {name: 'Transações com Neo4j Python'})
+ON CREATE SET ex.created_at = datetime()
+ON MATCH SET ex.updated_at = datetime()
+SET ex += {
   type: 'Transactions',
-  name: 'Transações com Neo4j Python',
-  created_at: datetime(),
   code: 'def transfer_funds(driver, from_account, to_account, amount):
     with driver.session() as session:
         def transaction_function(tx):
@@ -110,20 +111,21 @@ CREATE (ex:PythonExample {
         
         session.execute_write(transaction_function)',
   description: 'Transação atômica para transferência bancária'
-})
+}
 RETURN ex.name as exemplo
 """
 
 result = execute_cypher(transaction_example)
 if result:
-    print(f"✅ Transaction Example: {result.strip()}")
+    output.append(f"✅ Transaction Example: {result.strip()}")
 
 # 3. Exemplo de Índices e Constraints
 index_example = """
-CREATE (ex:PythonExample {
+MERGE (ex:PythonExample {name: 'Índices e Constraints Python'})
+ON CREATE SET ex.created_at = datetime()
+ON MATCH SET ex.updated_at = datetime()
+SET ex += {
   type: 'Indexes_Constraints',
-  name: 'Índices e Constraints Python',
-  created_at: datetime(),
   commands: [
     'CREATE INDEX person_name FOR (p:Person) ON (p.name)',
     'CREATE CONSTRAINT unique_email FOR (p:Person) REQUIRE p.email IS UNIQUE',
@@ -131,20 +133,21 @@ CREATE (ex:PythonExample {
   ],
   python_code: 'driver.execute_query("CREATE INDEX person_name FOR (p:Person) ON (p.name)")',
   description: 'Criar índices para melhorar performance de queries'
-})
+}
 RETURN ex.name as exemplo
 """
 
 result = execute_cypher(index_example)
 if result:
-    print(f"✅ Index Example: {result.strip()}")
+    output.append(f"✅ Index Example: {result.strip()}")
 
 # 4. Exemplo de Agregações
 aggregation_example = """
-CREATE (ex:PythonExample {
+MERGE (ex:PythonExample {name: 'Agregações e Estatísticas'})
+ON CREATE SET ex.created_at = datetime()
+ON MATCH SET ex.updated_at = datetime()
+SET ex += {
   type: 'Aggregations',
-  name: 'Agregações e Estatísticas',
-  created_at: datetime(),
   queries: [
     'MATCH (p:Person) RETURN COUNT(p) as total',
     'MATCH (p:Person) RETURN AVG(p.age) as idade_media',
@@ -155,20 +158,21 @@ CREATE (ex:PythonExample {
     "MATCH (p:Person) RETURN p.city, COUNT(p) as total, AVG(p.age) as avg_age"
 )',
   description: 'Usar funções de agregação para análises'
-})
+}
 RETURN ex.name as exemplo
 """
 
 result = execute_cypher(aggregation_example)
 if result:
-    print(f"✅ Aggregation Example: {result.strip()}")
+    output.append(f"✅ Aggregation Example: {result.strip()}")
 
 # 5. Padrões de Modelagem
 modeling_patterns = """
-CREATE (pat:ModelingPattern {
+MERGE (pat:ModelingPattern {name: 'Padrões de Modelagem de Grafos'})
+ON CREATE SET pat.created_at = datetime()
+ON MATCH SET pat.updated_at = datetime()
+SET pat += {
   type: 'Graph_Patterns',
-  name: 'Padrões de Modelagem de Grafos',
-  created_at: datetime(),
   patterns: [
     'Rede Social: (Person)-[:FOLLOWS]->(Person)',
     'E-commerce: (Customer)-[:PURCHASED]->(Product)',
@@ -183,25 +187,27 @@ CREATE (pat:ModelingPattern {
     'Evite arrays grandes em propriedades',
     'Use labels descritivos e no singular'
   ]
-})
+}
 RETURN pat.name as padrao
 """
 
 result = execute_cypher(modeling_patterns)
 if result:
-    print(f"✅ Modeling Pattern: {result.strip()}")
+    output.append(f"✅ Modeling Pattern: {result.strip()}")
 
 # Verificar total de conhecimento salvo
-print("\n📊 Resumo do Conhecimento Salvo:")
+output.append("\n📊 Resumo do Conhecimento Salvo:")
 summary = """
 MATCH (n)
-WHERE n.created_at > datetime() - duration('PT1H')
+WHERE coalesce(n.updated_at, n.created_at) > datetime() - duration('PT1H')
 RETURN labels(n)[0] as tipo, COUNT(n) as quantidade
 ORDER BY quantidade DESC
 """
 
 result = execute_cypher(summary)
 if result:
-    print(result)
+    output.append(result)
+
+output.append("\n✨ Conhecimento Neo4j + Python salvo com sucesso no grafo!")
 
-print("\n✨ Conhecimento Neo4j + Python salvo com sucesso no grafo!")
\ No newline at end of file
+sys.stdout.write("\n".join(output) + "\n")
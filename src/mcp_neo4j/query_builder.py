@@ -6,6 +6,10 @@ Baseado nos padrões identificados no projeto
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 import json
+import re
+
+# Encoder único e compacto para propriedades serializadas como string JSON
+encode_json = json.JSONEncoder(separators=(",", ":")).encode
 
 
 class QueryBuilder:
@@ -126,7 +130,7 @@ class QueryTemplates:
             properties={
                 "type": memory_type,
                 "content": content,
-                "metadata": json.dumps(metadata or {})
+                "metadata": encode_json(metadata or {})
             }
         )
         return query, params
@@ -211,26 +215,47 @@ class QueryTemplates:
     @staticmethod
     def get_knowledge_graph_stats() -> tuple:
         """Estatísticas do grafo de conhecimento"""
+        # Subqueries independentes em vez de UNION (colunas diferentes não
+        # podem ser unidas); uma única linha com as duas agregações
         query = """
-        MATCH (n)
-        WITH labels(n) as node_labels
-        UNWIND node_labels as label
-        WITH label, count(*) as count
-        RETURN collect({label: label, count: count}) as node_stats
-        
-        UNION
-        
-        MATCH ()-[r]->()
-        WITH type(r) as rel_type, count(*) as count
-        RETURN collect({type: rel_type, count: count}) as relationship_stats
+        CALL {
+            MATCH (n)
+            UNWIND labels(n) as label
+            WITH label, count(*) as count
+            RETURN collect({label: label, count: count}) as node_stats
+        }
+        CALL {
+            MATCH ()-[r]->()
+            WITH type(r) as rel_type, count(*) as count
+            RETURN collect({type: rel_type, count: count}) as relationship_stats
+        }
+        RETURN node_stats, relationship_stats
         """
         
         return query, {}
 
 
+SCHEMA_NAME_PATTERN = re.compile(r"CREATE (?:FULLTEXT )?(?:CONSTRAINT|INDEX) (\w+) IF NOT EXISTS")
+
+
 class SchemaManager:
     """Gerenciador de schema e constraints"""
     
+    @staticmethod
+    def schema_name(query: str) -> Optional[str]:
+        """Extrai o nome do índice/constraint de um comando de criação"""
+        match = SCHEMA_NAME_PATTERN.match(query)
+        return match.group(1) if match else None
+    
+    @staticmethod
+    def pending_constraints(existing_names: set) -> List[tuple]:
+        """Constraints/índices que ainda não existem no banco"""
+        return [
+            (query, params)
+            for query, params in SchemaManager.create_constraints()
+            if SchemaManager.schema_name(query) not in existing_names
+        ]
+    
     @staticmethod
     def create_constraints() -> List[tuple]:
         """Cria constraints essenciais"""
@@ -244,11 +269,19 @@ class SchemaManager:
             # Constraint de unicidade para BugFix
             ("CREATE CONSTRAINT bugfix_name_unique IF NOT EXISTS FOR (b:BugFix) REQUIRE b.name IS UNIQUE", {}),
             
+            # Constraints para regras e práticas geradas pelo modo autônomo
+            ("CREATE CONSTRAINT rule_name_unique IF NOT EXISTS FOR (r:Rule) REQUIRE r.name IS UNIQUE", {}),
+            ("CREATE CONSTRAINT bestpractice_name_unique IF NOT EXISTS FOR (bp:BestPractice) REQUIRE bp.name IS UNIQUE", {}),
+            
             # Índices para performance
             ("CREATE INDEX memory_type_index IF NOT EXISTS FOR (m:Memory) ON (m.type)", {}),
             ("CREATE INDEX memory_created_index IF NOT EXISTS FOR (m:Memory) ON (m.created_at)", {}),
             ("CREATE INDEX learning_tags_index IF NOT EXISTS FOR (l:Learning) ON (l.tags)", {}),
+            ("CREATE INDEX error_created_index IF NOT EXISTS FOR (e:Error) ON (e.created_at)", {}),
+            ("CREATE INDEX success_created_index IF NOT EXISTS FOR (s:SuccessfulExecution) ON (s.created_at)", {}),
+            ("CREATE INDEX documentation_created_index IF NOT EXISTS FOR (d:Documentation) ON (d.created_at)", {}),
             ("CREATE FULLTEXT INDEX memory_search_index IF NOT EXISTS FOR (m:Memory) ON EACH [m.content, m.description]", {}),
+            ("CREATE FULLTEXT INDEX decision_search_index IF NOT EXISTS FOR (d:Decision) ON EACH [d.topic, d.description]", {}),
         ]
         
         return constraints
@@ -269,6 +302,6 @@ class SchemaManager:
         # Converter listas e dicts para JSON strings se necessário
         for key, value in cleaned.items():
             if isinstance(value, (dict, list)):
-                cleaned[key] = json.dumps(value)
+                cleaned[key] = encode_json(value)
         
         return cleaned
\ No newline at end of file
@@ -6,11 +6,19 @@ Consulta conhecimento armazenado no grafo para melhorar decisões
 
 from typing import Dict, List, Any, Optional
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import logging
 from neo4j import GraphDatabase
 
 logger = logging.getLogger(__name__)
 
+LUCENE_SPECIAL_CHARS = set('+-&|!(){}[]^"~*?:\\/')
+
+
+def escape_lucene(text: str) -> str:
+    """Escapa caracteres especiais para consultas em índices fulltext"""
+    return "".join(f"\\{c}" if c in LUCENE_SPECIAL_CHARS else c for c in text)
+
 
 class SelfImprover:
     """Sistema que busca conhecimento no Neo4j para auto-aprimoramento"""
@@ -46,6 +54,23 @@ class SelfImprover:
     
     def get_past_decisions(self, topic: str) -> List[Dict]:
         """Busca decisões anteriores sobre um tópico"""
+        # Busca pelo índice fulltext (criado pelo SchemaManager)
+        query = """
+        CALL db.index.fulltext.queryNodes('decision_search_index', $search)
+        YIELD node as d
+        RETURN d.topic as topic,
+               d.decision as decision,
+               d.reason as reason,
+               d.outcome as outcome,
+               d.created_at as date
+        ORDER BY d.created_at DESC
+        LIMIT 5
+        """
+        try:
+            return self.conn.execute_query(query, {"search": escape_lucene(topic)})
+        except Exception as e:
+            logger.debug(f"Índice fulltext indisponível, usando CONTAINS: {e}")
+        
         query = """
         MATCH (d:Decision)
         WHERE d.topic CONTAINS $topic OR d.description CONTAINS $topic
@@ -97,21 +122,27 @@ class SelfImprover:
             "warnings": []
         }
         
+        # As quatro leituras são independentes: executar em paralelo
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            rules_future = executor.submit(self.get_project_rules)
+            knowledge_future = executor.submit(self.get_relevant_knowledge, current_task)
+            decisions_future = executor.submit(self.get_past_decisions, current_task)
+            errors_future = executor.submit(self.get_error_patterns)
+        
         # Buscar regras aplicáveis
-        rules = self.get_project_rules()
+        rules = rules_future.result()
         suggestions["rules"] = [r for r in rules if r["description"]]
         
         # Buscar conhecimento relevante
-        knowledge = self.get_relevant_knowledge(current_task)
-        suggestions["relevant_knowledge"] = knowledge
+        suggestions["relevant_knowledge"] = knowledge_future.result()
         
         # Buscar decisões anteriores
-        decisions = self.get_past_decisions(current_task)
-        suggestions["past_decisions"] = decisions
+        suggestions["past_decisions"] = decisions_future.result()
         
         # Verificar padrões de erro
-        errors = self.get_error_patterns()
-        relevant_errors = [e for e in errors if current_task.lower() in str(e).lower()]
+        errors = errors_future.result()
+        task_lower = current_task.lower()
+        relevant_errors = [e for e in errors if task_lower in str(e).lower()]
         if relevant_errors:
             suggestions["warnings"] = relevant_errors
         
@@ -21,7 +21,10 @@ async def _prepare_memory(
     """Establish connection and prepare the Neo4j memory layer."""
 
     await connection.connect()
-    memory = Neo4jMemory(connection.driver)
+    memory = Neo4jMemory(connection.driver, connection.config.database)
+
+    logger.debug("Garantindo constraints de schema")
+    await memory.create_constraints()
 
     if memory_config.enable_fulltext_index:
         logger.debug("Garantindo índice fulltext")
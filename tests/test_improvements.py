@@ -4,6 +4,7 @@ Script de teste para validar todas as melhorias implementadas
 """
 
 import json
+import os
 import time
 from datetime import datetime
 from src.mcp_neo4j.connection_manager import ConnectionPool, QueryCache
@@ -16,6 +17,20 @@ NEO4J_USERNAME = "neo4j"
 NEO4J_PASSWORD = "password"
 NEO4J_DATABASE = "neo4j"
 
+# Dumps indentados só quando pedidos explicitamente
+VERBOSE = bool(os.environ.get("MCP_TEST_VERBOSE"))
+
+# Separadores dos banners, montados uma única vez
+SEPARATOR = "=" * 60
+SECTION_BREAK = "\n" + SEPARATOR
+
+
+def format_stats(data):
+    """Formata dicionário de métricas para exibição"""
+    if VERBOSE:
+        return json.dumps(data, indent=2, default=str)
+    return json.dumps(data, default=str)
+
 
 def test_connection_pool():
     """Testa o pool de conexões com circuit breaker"""
@@ -34,7 +49,7 @@ def test_connection_pool():
     
     # Teste 2: Métricas
     metrics = pool.get_metrics()
-    print(f"📊 Métricas: {json.dumps(metrics, indent=2)}")
+    print(f"📊 Métricas: {format_stats(metrics)}")
     assert metrics["queries_executed"] > 0
     print("✅ Sistema de métricas funcionando")
     
@@ -136,7 +151,7 @@ def test_batch_operations():
     # Processar em batches
     stats = processor.batch_create_nodes("BatchTest", test_data)
     
-    print(f"📊 Batch stats: {json.dumps(stats, indent=2)}")
+    print(f"📊 Batch stats: {format_stats(stats)}")
     assert stats["processed"] == 250
     assert stats["batches"] == 3  # 250/100 = 3 batches
     print("✅ Batch processing funcionando")
@@ -227,9 +242,9 @@ def test_query_templates():
 
 def run_all_tests():
     """Executa todos os testes"""
-    print("=" * 60)
+    print(SEPARATOR)
     print("🚀 INICIANDO TESTES DAS MELHORIAS IMPLEMENTADAS")
-    print("=" * 60)
+    print(SEPARATOR)
     
     tests = [
         ("Connection Pool", test_connection_pool),
@@ -249,9 +264,9 @@ def run_all_tests():
             print(f"❌ Erro no teste {name}: {e}")
             results.append((name, f"❌ FALHOU: {e}"))
     
-    print("\n" + "=" * 60)
+    print(SECTION_BREAK)
     print("📊 RESUMO DOS TESTES")
-    print("=" * 60)
+    print(SEPARATOR)
     
     for name, status in results:
         print(f"{name:20} {status}")
@@ -259,12 +274,12 @@ def run_all_tests():
     passed = sum(1 for _, status in results if "✅" in status)
     total = len(results)
     
-    print("\n" + "=" * 60)
+    print(SECTION_BREAK)
     if passed == total:
         print(f"🎉 TODOS OS {total} TESTES PASSARAM!")
     else:
         print(f"⚠️ {passed}/{total} testes passaram")
-    print("=" * 60)
+    print(SEPARATOR)
 
 
 if __name__ == "__main__":
@@ -238,6 +238,27 @@ class TestBatchProcessorMethods:
         assert result["total_items"] == 2
         mock_connection_pool.execute_with_retry.assert_called()
 
+    def test_batch_create_relationships_uses_labels(self, batch_processor, mock_connection_pool):
+        """Verifica que cada par de labels gera MATCH com label explícito"""
+        relationships = [
+            {"from_label": "Learning", "from_name": "a",
+             "to_label": "Memory", "to_name": "b", "rel_type": "USES"},
+            {"from_label": "Learning", "from_name": "c",
+             "to_label": "Memory", "to_name": "d", "rel_type": "USES"},
+            {"from_label": "BugFix", "from_name": "e",
+             "to_label": "Memory", "to_name": "f", "rel_type": "FIXES"}
+        ]
+
+        result = batch_processor.batch_create_relationships(relationships)
+
+        assert result["total_items"] == 3
+        assert mock_connection_pool.execute_with_retry.call_count == 2
+
+        first_query = mock_connection_pool.execute_with_retry.call_args_list[0][0][0]
+        assert "(from:`Learning` {name: rel.from_name})" in first_query
+        assert "(to:`Memory` {name: rel.to_name})" in first_query
+        assert "labels(from)" not in first_query
+
 
 # ============================================================================
 # Testes de Performance
@@ -434,3 +434,74 @@ class TestCypherCompatibility:
         # Deve ter padrão correto (from)-[r:REL]->(to)
         assert "-[r:" in query or "]-(" in query
         assert "]->" in query
+
+
+# ============================================================================
+# Testes de QueryTemplates
+# ============================================================================
+
+class TestQueryTemplates:
+    """Testes dos templates de domínio"""
+
+    def test_knowledge_graph_stats_single_row(self):
+        """Verifica que as estatísticas vêm de subqueries, sem UNION"""
+        from mcp_neo4j.query_builder import QueryTemplates
+
+        query, params = QueryTemplates.get_knowledge_graph_stats()
+
+        assert "UNION" not in query
+        assert query.count("CALL {") == 2
+        assert "RETURN node_stats, relationship_stats" in query
+        assert params == {}
+
+
+class TestSchemaManager:
+    """Testes do gerenciador de schema"""
+
+    def test_schema_name_from_create_statements(self):
+        """Verifica extração do nome de constraints e índices"""
+        from mcp_neo4j.query_builder import SchemaManager
+
+        for query, _ in SchemaManager.create_constraints():
+            assert SchemaManager.schema_name(query) is not None
+
+        assert SchemaManager.schema_name("RETURN 1") is None
+
+    def test_pending_constraints_skips_existing(self):
+        """Verifica que índices já existentes não são recriados"""
+        from mcp_neo4j.query_builder import SchemaManager
+
+        all_constraints = SchemaManager.create_constraints()
+        pending = SchemaManager.pending_constraints({"memory_name_unique", "memory_search_index"})
+
+        assert len(pending) == len(all_constraints) - 2
+        names = {SchemaManager.schema_name(query) for query, _ in pending}
+        assert "memory_name_unique" not in names
+        assert "memory_search_index" not in names
+
+
+# ============================================================================
+# Testes de MemoryQueries (database/queries.py)
+# ============================================================================
+
+class TestMemoryQueries:
+    """Testes dos templates de MemoryQueries"""
+
+    def test_create_memory_computes_datetime_once(self):
+        """Verifica que created_at e updated_at usam o mesmo datetime()"""
+        from mcp_neo4j.database.queries import MemoryQueries
+
+        query = MemoryQueries.create_memory("Learning")
+
+        assert query.count("datetime()") == 1
+        assert "n.created_at = now" in query
+        assert "n.updated_at = now" in query
+
+    def test_find_stale_nodes_uses_days(self):
+        """Verifica que o limite de dias é aplicado na query"""
+        from mcp_neo4j.database.queries import MemoryQueries
+
+        query = MemoryQueries.find_stale_nodes("Learning", days=30)
+
+        assert "{days: 30}" in query
+        assert query.count("datetime()") == 1